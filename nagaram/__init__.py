@@ -1,7 +1,9 @@
 """Nagaram. Scrabble word anagram finder.
 
 Usage:
-    nagaram [--sowpods] [-l] [-s chars] [-e chars] <letters>
+    nagaram [--sowpods] [-l] [-s chars] [-e chars] [--min-length N]
+            [--max-length N] [--engine name] <letters>
+    nagaram [--sowpods] [-s chars] [-e chars] [-i FILE] [-o FILE] [-w N]
 
 ? can be used to represent another tile on the board to play on
 _ can be used to represent blank tiles in your rack (no points)
@@ -14,6 +16,19 @@ rather than the default of by Scrabble score.
 
 The -s flag can be used to provide starting characters already on the board,
 similarily the -e flag can be used for ending characters.
+
+The --min-length and --max-length flags limit the anagrams found to words of
+at least or at most that many letters.
+
+The --engine flag forces a search engine (alphagram, prefix or scan) rather
+than letting nagaram pick the fastest one for each search.
+
+The -i or --input flag reads racks line by line from a file, or stdin if "-"
+is given. Each line is either "letters [start [end]]" or a JSON object with
+"letters", "start" and "end" keys. Results are written as JSON lines, in input
+order, to stdout or the file given with -o or --output. A line which can not
+be read is written as {"line": number, "error": reason} and the rest carry on.
+The -w or --workers flag sets the number of processes used to solve the racks.
 """
 
 
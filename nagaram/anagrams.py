@@ -1,59 +1,133 @@
 """Anagram finding functions."""
 
 
-from nagaram.scrabble import blank_tiles, word_list, word_score
+from nagaram.engines import ENGINES, REFERENCE_ENGINE, search
+from nagaram.lexicon import load_length_index
+from nagaram.scrabble import blank_tiles, word_score
+from nagaram.tilesets import TILESETS
 
 
-def _letter_map(word):
-    """Creates a map of letter use in a word.
-
-    Args:
-        word: a string to create a letter map from
+def _query(word, sowpods, start, end, min_length, max_length, tileset):
+    """Breaks a search down into the arguments the engines take.
 
     Returns:
-        a dictionary of {letter: integer count of letter in word}
+        a tuple of:
+            a list of the letters available: the rack, start and end, each
+            split into tiles on its own
+            integer number of blanks (no points)
+            integer number of questions (points)
+            a list of the word lengths to search
     """
 
-    lmap = {}
-    for letter in word:
-        try:
-            lmap[letter] += 1
-        except KeyError:
-            lmap[letter] = 1
-    return lmap
+    input_letters, blanks, questions = blank_tiles(word)
+    input_letters = ["".join(input_letters), start, end]
+
+    # no word can be longer than every tile we have to make it with
+    longest = sum(tileset.rack_counts(input_letters)) + blanks + questions
+    if max_length is None or max_length > longest:
+        max_length = longest
+
+    lengths = load_length_index(sowpods).lengths(min_length, max_length)
+    return input_letters, blanks, questions, lengths
 
 
-def anagrams_in_word(word, sowpods=False, start="", end=""):
+def anagrams_in_word(word, sowpods=False, start="", end="", min_length=None,
+                     max_length=None, engine=None, tileset=None):
     """Finds anagrams in word.
 
     Args:
         word: the string to base our search off of
-        sowpods: boolean to declare TWL or SOWPODS words file
+        sowpods: boolean to declare TWL or SOWPODS words file, or the name of
+                 a word list from nagaram.tilesets.install_word_list
         start: a string of starting characters to find anagrams based on
         end: a string of ending characters to find anagrams based on
+        min_length: integer minimum length of anagrams to find, or None
+        max_length: integer maximum length of anagrams to find, or None
+        engine: string name of the search engine to use, or None to pick the
+                cheapest one for this query
+        tileset: the TileSet of the word list's language, English if None
 
     Yields:
-        a tuple of (word, score) that can be made with the input_word
+        a tuple of (word, score) that can be made with the input_word, grouped
+        by word length from shortest to longest
+
+    Raises:
+        ValueError if engine is not a registered engine
     """
 
-    input_letters, blanks, questions = blank_tiles(word)
+    tileset = tileset or TILESETS["english"]
+    input_letters, blanks, questions, lengths = _query(
+        word, sowpods, start, end, min_length, max_length, tileset)
+
+    for word in search(sowpods, input_letters, blanks + questions, start, end,
+                       lengths, engine, tileset):
+        yield (word, word_score(word, input_letters, questions, tileset))
+
+
+def tile_anagrams(word, word_list, tileset, start="", end="",
+                  min_length=None, max_length=None, engine=None):
+    """Finds anagrams in word from a word list in another language.
+
+    Lengths are counted in tiles, so digraph tiles (eg: the Spanish "ch")
+    are a single tile each.
+
+    Args:
+        word: the string to base our search off of
+        word_list: the string name of a word list from
+                   nagaram.tilesets.install_word_list
+        tileset: the TileSet of the word list's language
+        start: a string of starting characters to find anagrams based on
+        end: a string of ending characters to find anagrams based on
+        min_length: integer minimum length in tiles of anagrams to find
+        max_length: integer maximum length in tiles of anagrams to find
+        engine: string name of the search engine to use, or None
+
+    Yields:
+        a tuple of (word, score) that can be made with the input word,
+        grouped by length in tiles from shortest to longest
+
+    Raises:
+        ValueError if word_list was never installed, or engine is not a
+        registered engine
+    """
+
+    return anagrams_in_word(word, word_list, start, end, min_length,
+                            max_length, engine, tileset)
+
+
+def compare_engines(word, sowpods=False, start="", end="", min_length=None,
+                    max_length=None, engines=None):
+    """Runs a query on every engine and compares them to the reference.
+
+    Args:
+        word: the string to base our search off of
+        sowpods: boolean to declare TWL or SOWPODS words file
+        start: a string of starting characters to find anagrams based on
+        end: a string of ending characters to find anagrams based on
+        min_length: integer minimum length of anagrams to find, or None
+        max_length: integer maximum length of anagrams to find, or None
+        engines: a list of engine names to check, or None for all of them
+
+    Returns:
+        a dictionary of {engine name: (missing words, extra words)} for every
+        engine which disagrees with the reference engine, empty if they all
+        agree
+    """
+
+    input_letters, blanks, questions, lengths = _query(
+        word, sowpods, start, end, min_length, max_length,
+        TILESETS["english"])
+    query = (sowpods, input_letters, blanks + questions, start, end, lengths)
 
-    for tile in start + end:
-        input_letters.append(tile)
-
-    for word in word_list(sowpods, start, end):
-        lmap = _letter_map(input_letters)
-        used_blanks = 0
-        for letter in word:
-            if letter in lmap:
-                lmap[letter] -= 1
-                if lmap[letter] < 0:
-                    used_blanks += 1
-                    if used_blanks > (blanks + questions):
-                        break
-            else:
-                used_blanks += 1
-                if used_blanks > (blanks + questions):
-                    break
-        else:
-            yield (word, word_score(word, input_letters, questions))
+    expected = set(search(*query, engine=REFERENCE_ENGINE))
+    mismatches = {}
+    for engine in sorted(engines or ENGINES):
+        if engine == REFERENCE_ENGINE:
+            continue
+        received = set(search(*query, engine=engine))
+        if received != expected:
+            mismatches[engine] = (
+                sorted(expected - received),
+                sorted(received - expected),
+            )
+    return mismatches
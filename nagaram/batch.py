@@ -0,0 +1,203 @@
+"""Batch anagram lookups, for driving nagaram from scripts and offline jobs."""
+
+
+from __future__ import unicode_literals
+
+import json
+import functools
+import itertools
+from multiprocessing import Pool
+
+from nagaram.anagrams import anagrams_in_word
+from nagaram.scrabble import valid_scrabble_word
+from nagaram.shared import attach_shared_index, check_shared_index
+
+
+def parse_rack(line, start="", end=""):
+    """Parses a line of batch input into a query.
+
+    Lines are either a JSON object with a "letters" key and optional "start"
+    and "end" keys, or whitespace separated fields of: letters [start [end]].
+
+    Args:
+        line: a single line of input
+        start: the default string of starting characters
+        end: the default string of ending characters
+
+    Returns:
+        a tuple of (letters, start, end), or None for blank lines
+
+    Raises:
+        ValueError if the line can not be parsed
+    """
+
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith("{"):
+        query = json.loads(line)
+        try:
+            letters = query["letters"]
+        except (KeyError, TypeError):
+            raise ValueError("Missing letters in: {0}".format(line))
+        query = (letters, query.get("start", start), query.get("end", end))
+        if not all(isinstance(field, str) for field in query):
+            raise ValueError("Letters, start and end must be strings in: "
+                             "{0}".format(line))
+        return query
+
+    fields = line.split()
+    if len(fields) > 3:
+        raise ValueError("Too many fields in: {0}".format(line))
+
+    fields.extend([start, end][len(fields) - 1:])
+    return tuple(fields)
+
+
+def solve_rack(query, sowpods=False, min_length=None, max_length=None,
+               engine=None):
+    """Finds all anagrams for a single parsed query.
+
+    Args:
+        query: a tuple of (letters, start, end) from parse_rack
+        sowpods: boolean to declare TWL or SOWPODS words file
+        min_length: integer minimum length of anagrams to find, or None
+        max_length: integer maximum length of anagrams to find, or None
+        engine: string name of the search engine to use, or None
+
+    Returns:
+        a dictionary of the query and its anagrams, sorted by score then word
+    """
+
+    letters, start, end = query
+    anagrams = sorted(
+        anagrams_in_word(letters, sowpods, start, end, min_length,
+                         max_length, engine),
+        key=lambda scored: (-scored[1], scored[0]),
+    )
+    return {
+        "letters": letters,
+        "start": start,
+        "end": end,
+        "valid": valid_scrabble_word(letters),
+        "anagrams": [[word, score] for word, score in anagrams],
+    }
+
+
+def _parse_lines(lines, start, end):
+    """Parses every line of batch input, numbering them from 1.
+
+    Yields:
+        a tuple of (line number, query or None, error string or None) for
+        every line which is not blank
+    """
+
+    for number, line in enumerate(lines, 1):
+        try:
+            query = parse_rack(line, start, end)
+        except ValueError as error:
+            yield number, None, str(error)
+        else:
+            if query is not None:
+                yield number, query, None
+
+
+def _solve_line(parsed, **kwargs):
+    """Solves a numbered query from _parse_lines, or reports its error.
+
+    Returns:
+        the result dictionary from solve_rack, or a dictionary of the line
+        number and error string if the line could not be parsed or solved
+    """
+
+    number, query, error = parsed
+    if error is None:
+        try:
+            return solve_rack(query, **kwargs)
+        except (TypeError, ValueError) as solve_error:
+            error = str(solve_error)
+    return {"line": number, "error": error}
+
+
+def batch_anagrams(lines, sowpods=False, start="", end="", workers=1,
+                   buffer_size=None, min_length=None, max_length=None,
+                   engine=None, shared_index=None):
+    """Finds anagrams for every rack in lines.
+
+    Racks are solved in chunks of buffer_size across workers processes, with
+    at most two chunks in flight at once, so memory use stays bounded no
+    matter how long the input is. A line which can not be parsed or solved
+    does not stop the batch, its result is an error record instead.
+
+    Args:
+        lines: an iterable of input lines, see parse_rack for the format
+        sowpods: boolean to declare TWL or SOWPODS words file
+        start: the default string of starting characters
+        end: the default string of ending characters
+        workers: integer number of processes to solve racks with
+        buffer_size: integer number of racks per chunk (default 64 * workers)
+        min_length: integer minimum length of anagrams to find, or None
+        max_length: integer maximum length of anagrams to find, or None
+        engine: string name of the search engine to use, or None
+        shared_index: string name of a shared memory index for the workers to
+                      attach to, from nagaram.shared.create_shared_index,
+                      holding the same word list as sowpods
+
+    Yields:
+        a result dictionary from solve_rack per rack, or a dictionary of
+        {"line": integer line number, "error": string} for a bad line, in
+        input order
+    """
+
+    queries = _parse_lines(lines, start, end)
+    solve = functools.partial(
+        _solve_line,
+        sowpods=sowpods,
+        min_length=min_length,
+        max_length=max_length,
+        engine=engine,
+    )
+
+    if workers < 2:
+        for query in queries:
+            yield solve(query)
+        return
+
+    buffer_size = buffer_size or 64 * workers
+    chunksize = max(1, buffer_size // (workers * 4))
+    if shared_index:
+        check_shared_index(shared_index, sowpods)
+        pool = Pool(workers, attach_shared_index,
+                    (shared_index, True, sowpods))
+    else:
+        pool = Pool(workers)
+    try:
+        pending = None
+        while True:
+            chunk = list(itertools.islice(queries, buffer_size))
+            submitted = None
+            if chunk:
+                submitted = pool.map_async(solve, chunk, chunksize)
+            if pending is not None:
+                for result in pending.get():
+                    yield result
+            if submitted is None:
+                break
+            pending = submitted
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def write_jsonl(results, output):
+    """Writes results to output as JSON lines.
+
+    Args:
+        results: an iterable of result dictionaries from batch_anagrams
+        output: a writable text file object
+    """
+
+    for result in results:
+        output.write(json.dumps(result, sort_keys=True))
+        output.write("\n")
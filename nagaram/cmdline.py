@@ -3,14 +3,36 @@
 
 from __future__ import print_function, unicode_literals
 
+import io
 import sys
+import itertools
 import argparse
+from collections import namedtuple
 
 import nagaram
 from nagaram.anagrams import anagrams_in_word
+from nagaram.engines import ENGINES
+from nagaram.batch import batch_anagrams, write_jsonl
 from nagaram.scrabble import valid_scrabble_word
 
 
+# the parsed command line, the first five fields are what argument_parser
+# returns
+Options = namedtuple("Options", (
+    "wordlist",
+    "sowpods",
+    "by_length",
+    "start",
+    "end",
+    "input",
+    "output",
+    "workers",
+    "min_length",
+    "max_length",
+    "engine",
+))
+
+
 def pretty_print(input_word, anagrams, by_length=False):
     """Prints the anagram results sorted by score to stdout.
 
@@ -23,11 +45,12 @@ def pretty_print(input_word, anagrams, by_length=False):
     scores = {}
     if by_length:
         noun = "tiles"
-        for word, score in anagrams:
-            try:
-                scores[len(word)].append("{0} ({1:d})".format(word, score))
-            except KeyError:
-                scores[len(word)] = ["{0} ({1:d})".format(word, score)]
+        # anagrams_in_word yields a length bucket at a time, take them whole
+        for length, bucket in itertools.groupby(anagrams,
+                                                lambda scored: len(scored[0])):
+            scores.setdefault(length, []).extend(
+                "{0} ({1:d})".format(word, score) for word, score in bucket
+            )
     else:
         noun = "points"
         for word, score in anagrams:
@@ -42,7 +65,7 @@ def pretty_print(input_word, anagrams, by_length=False):
         print("{0} is not possible in Scrabble.".format(input_word))
 
     for key, value in sorted(scores.items(), reverse=True):
-        print("{0:d} {1}: {2}".format(key, noun, ", ".join(value)))
+        print("{0:d} {1}: {2}".format(key, noun, ", ".join(sorted(value))))
 
 
 def argument_parser(args):
@@ -63,6 +86,33 @@ def argument_parser(args):
         SystemExit if the user passes invalid arguments, --version or --help
     """
 
+    return tuple(parse_options(args)[:5])
+
+
+def parse_options(args):
+    """Argparse logic, every command line option.
+
+    Args:
+        args: sys.argv[1:], everything passed to the program after its name
+
+    Returns:
+        an Options namedtuple of:
+            wordlist: a list of words/letters to search
+            sowpods: a boolean to declare using the sowpods words file
+            by_length: a boolean to declare outputting anagrams by length
+            start: a string of starting characters to find anagrams based on
+            end: a string of ending characters to find anagrams based on
+            input: a string path to read racks from, "-" for stdin, or None
+            output: a string path to write JSON lines results to, or None
+            workers: an integer number of worker processes for batch mode
+            min_length: an integer minimum anagram length, or None
+            max_length: an integer maximum anagram length, or None
+            engine: a string name of the search engine to use, or None
+
+    Raises:
+        SystemExit if the user passes invalid arguments, --version or --help
+    """
+
     parser = argparse.ArgumentParser(
         prog="nagaram",
         description="Finds Scabble anagrams.",
@@ -122,6 +172,57 @@ def argument_parser(args):
         )
     )
 
+    parser.add_argument(
+        "--min-length",
+        dest="min_length",
+        metavar="N",
+        default=None,
+        type=int,
+    )
+
+    parser.add_argument(
+        "--max-length",
+        dest="max_length",
+        metavar="N",
+        default=None,
+        type=int,
+    )
+
+    parser.add_argument(
+        "--engine",
+        dest="engine",
+        metavar="name",
+        default=None,
+        choices=sorted(ENGINES),
+    )
+
+    parser.add_argument(
+        "--input",
+        "-i",
+        dest="input",
+        metavar="FILE",
+        default=None,
+        type=str,
+    )
+
+    parser.add_argument(
+        "--output",
+        "-o",
+        dest="output",
+        metavar="FILE",
+        default=None,
+        type=str,
+    )
+
+    parser.add_argument(
+        "--workers",
+        "-w",
+        dest="workers",
+        metavar="N",
+        default=1,
+        type=int,
+    )
+
     parser.add_argument(
         dest="wordlist",
         metavar="letters to find anagrams with (? for anything, _ for blanks)",
@@ -133,7 +234,7 @@ def argument_parser(args):
     if settings.help:
         raise SystemExit(nagaram.__doc__.strip())
 
-    if not settings.wordlist:
+    if not settings.wordlist and not settings.input:
         raise SystemExit(parser.print_usage())
 
     if settings.starts_with:
@@ -141,8 +242,58 @@ def argument_parser(args):
     if settings.ends_with:
         settings.ends_with = settings.ends_with[0]
 
-    return (settings.wordlist, settings.sowpods, settings.length,
-            settings.starts_with, settings.ends_with)
+    return Options(
+        wordlist=settings.wordlist,
+        sowpods=settings.sowpods,
+        by_length=settings.length,
+        start=settings.starts_with,
+        end=settings.ends_with,
+        input=settings.input,
+        output=settings.output,
+        workers=settings.workers,
+        min_length=settings.min_length,
+        max_length=settings.max_length,
+        engine=settings.engine,
+    )
+
+
+def batch_main(wordlist, sowpods, start, end, input_file, output_file,
+               workers, min_length=None, max_length=None, engine=None):
+    """Batch mode, reads racks line by line and writes JSON lines results.
+
+    Args:
+        wordlist: a list of racks from the command line, solved first
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+        start: the default string of starting characters
+        end: the default string of ending characters
+        input_file: a string path to read racks from, "-" for stdin, or None
+        output_file: a string path to write results to, None for stdout
+        workers: an integer number of worker processes
+        min_length: an integer minimum anagram length, or None
+        max_length: an integer maximum anagram length, or None
+        engine: a string name of the search engine to use, or None
+    """
+
+    lines = list(wordlist)
+    if input_file == "-":
+        lines = itertools.chain(lines, sys.stdin)
+    elif input_file:
+        infile = io.open(input_file, encoding="utf-8")
+        lines = itertools.chain(lines, infile)
+
+    results = batch_anagrams(lines, sowpods, start, end, workers,
+                             min_length=min_length, max_length=max_length,
+                             engine=engine)
+
+    try:
+        if output_file:
+            with io.open(output_file, "w", encoding="utf-8") as outfile:
+                write_jsonl(results, outfile)
+        else:
+            write_jsonl(results, sys.stdout)
+    finally:
+        if input_file and input_file != "-":
+            infile.close()
 
 
 def main(arguments=None):
@@ -151,10 +302,19 @@ def main(arguments=None):
     if not arguments:
         arguments = sys.argv[1:]
 
-    wordlist, sowpods, by_length, start, end = argument_parser(arguments)
-    for word in wordlist:
+    options = parse_options(arguments)
+
+    if options.input or options.output:
+        return batch_main(options.wordlist, options.sowpods, options.start,
+                          options.end, options.input, options.output,
+                          options.workers, options.min_length,
+                          options.max_length, options.engine)
+
+    for word in options.wordlist:
         pretty_print(
             word,
-            anagrams_in_word(word, sowpods, start, end),
-            by_length,
+            anagrams_in_word(word, options.sowpods, options.start,
+                             options.end, options.min_length,
+                             options.max_length, options.engine),
+            options.by_length,
         )
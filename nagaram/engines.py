@@ -0,0 +1,280 @@
+"""Anagram search engines, and the planner which picks between them.
+
+Every engine finds the same words for a query, each is just faster for some
+shapes of query than the others. An engine is a search function yielding the
+words which can be made, a length at a time from shortest to longest and
+alphabetically within each length. It is registered alongside a cost function
+estimating how much work the search would take (or None if the engine can not
+run it).
+
+Both are called with the same arguments:
+    sowpods: boolean to declare TWL or SOWPODS words file, or the name of a
+             word list from nagaram.tilesets.install_word_list
+    letters: a list of strings of the letters available, including start
+             and end, each split into tiles on its own
+    wildcards: integer number of blanks and questions available
+    start: a string of starting characters the words must have
+    end: a string of ending characters the words must have
+    lengths: a list of the word lengths to search, in tiles
+    tileset: the TileSet the letters and words are counted in
+
+Racks and words are counted as lists of tile numbers from the tileset, so
+every language is checked with the same list lookups.
+"""
+
+
+import itertools
+
+from nagaram.lexicon import (
+    alphagram_index_loaded,
+    load_alphagram_index,
+    load_length_index,
+    load_lexicon,
+)
+from nagaram.tilesets import TILESETS
+
+
+ENGLISH = TILESETS["english"]
+ALPHABET = "".join(ENGLISH.tiles)
+REFERENCE_ENGINE = "scan"
+
+ENGINES = {}
+
+# rough per operation costs, in microseconds, used to compare engines
+_WORD_CHECK_COST = 4
+_ALPHAGRAM_LOOKUP_COST = 30
+_ALPHAGRAM_BUILD_COST = 3  # per word, only paid the first time
+
+
+def register_engine(name, cost):
+    """Decorator to register a search function as an engine.
+
+    Args:
+        name: the string name of the engine
+        cost: a function returning the estimated cost of a query, or None
+    """
+
+    def _register(search):
+        ENGINES[name] = (search, cost)
+        return search
+    return _register
+
+
+def _can_make(numbers, available, wildcards):
+    """Checks if a word can be made from the tiles available.
+
+    Args:
+        numbers: a list of the word's tile numbers, from TileSet.encode
+        available: a list of the count of each tile available, from
+                   TileSet.rack_counts
+        wildcards: integer number of blanks and questions available
+
+    Returns:
+        True or False
+    """
+
+    remaining = list(available)
+    used_blanks = 0
+    for number in numbers:
+        remaining[number] -= 1
+        if remaining[number] < 0:
+            used_blanks += 1
+            if used_blanks > wildcards:
+                return False
+    return True
+
+
+def _scan_cost(sowpods, letters, wildcards, start, end, lengths, tileset):
+    """Every word of the allowed lengths is checked."""
+
+    length_index = load_length_index(sowpods)
+    return _WORD_CHECK_COST * sum(
+        length_index.bucket_size(length) for length in lengths
+    )
+
+
+@register_engine("scan", _scan_cost)
+def _scan(sowpods, letters, wildcards, start, end, lengths, tileset):
+    """Checks every word in the length buckets. The reference engine."""
+
+    length_index = load_length_index(sowpods)
+    available = tileset.rack_counts(letters)
+    encode = tileset.encode
+    for length in lengths:
+        for word in length_index.bucket(length):
+            if (word.startswith(start) and word.endswith(end) and
+                    _can_make(encode(word), available, wildcards)):
+                yield word
+
+
+def _prefix_cost(sowpods, letters, wildcards, start, end, lengths,
+                 tileset):
+    """Only words in the range starting with start are checked."""
+
+    if not start:
+        return None
+    return _WORD_CHECK_COST * len(load_lexicon(sowpods).prefix_range(start))
+
+
+@register_engine("prefix", _prefix_cost)
+def _prefix(sowpods, letters, wildcards, start, end, lengths, tileset):
+    """Checks only the words in the sorted range beginning with start."""
+
+    length_index = load_length_index(sowpods)
+    lexicon = load_lexicon(sowpods).prefix_range(start)
+    available = tileset.rack_counts(letters)
+    encode = tileset.encode
+    for length in lengths:
+        for position in length_index.bucket_range(length, lexicon.start,
+                                                   lexicon.stop):
+            word = lexicon.word_bytes(position).decode("utf-8")
+            if (word.endswith(end) and
+                    _can_make(encode(word), available, wildcards)):
+                yield word
+
+
+def _sub_multisets(counts, sizes):
+    """Finds every sub-multiset of counts with a size in sizes.
+
+    Args:
+        counts: a list of (letter, integer count) tuples, sorted by letter
+        sizes: a set of integer sizes of sub-multisets to find
+
+    Yields:
+        each sub-multiset as a string of letters in sorted order
+    """
+
+    largest = max(sizes) if sizes else -1
+
+    def _choose(index, chosen, size):
+        if size in sizes:
+            yield "".join(chosen)
+        if index == len(counts) or size == largest:
+            return
+        letter, count = counts[index]
+        for taken in range(min(count, largest - size) + 1):
+            for found in _choose(index + 1, chosen + [letter] * taken,
+                                 size + taken):
+                yield found
+
+    return _choose(0, [], 0)
+
+
+def _wildcard_fills(wildcards):
+    """Counts the distinct ways of filling up to wildcards blank tiles."""
+
+    fills = 0
+    ways = 1
+    for used in range(wildcards + 1):
+        fills += ways
+        ways = ways * (len(ALPHABET) + used) // (used + 1)
+    return fills
+
+
+def _alphagram_cost(sowpods, letters, wildcards, start, end, lengths,
+                    tileset):
+    """Every sub-multiset of letters is looked up per wildcard fill.
+
+    Wildcards are filled from a to z, so only English can be searched. The
+    index is built on first use, which a one-off search has to pay for.
+    """
+
+    if tileset is not ENGLISH:
+        return None
+
+    subsets = 1
+    for count in tileset.rack_counts(letters):
+        subsets *= count + 1
+    cost = _ALPHAGRAM_LOOKUP_COST * subsets * _wildcard_fills(wildcards)
+
+    if not alphagram_index_loaded(sowpods):
+        cost += _ALPHAGRAM_BUILD_COST * len(load_lexicon(sowpods))
+    return cost
+
+
+@register_engine("alphagram", _alphagram_cost)
+def _alphagram(sowpods, letters, wildcards, start, end, lengths, tileset):
+    """Looks up every combination of the letters and wildcard fills.
+
+    Raises:
+        ValueError if tileset is not English
+    """
+
+    if tileset is not ENGLISH:
+        raise ValueError("The alphagram engine only searches English")
+
+    alphagram_index = load_alphagram_index(sowpods)
+    counts = [
+        (tile, count)
+        for tile, count in zip(tileset.tiles, tileset.rack_counts(letters))
+        if count
+    ]
+    fills = [
+        list(itertools.combinations_with_replacement(ALPHABET, used))
+        for used in range(wildcards + 1)
+    ]
+
+    for length in lengths:
+        found = set()
+        for used in range(min(wildcards, length) + 1):
+            for subset in _sub_multisets(counts, set([length - used])):
+                for fill in fills[used]:
+                    alphagram = "".join(sorted(subset + "".join(fill)))
+                    for word in alphagram_index.words(alphagram):
+                        if word.startswith(start) and word.endswith(end):
+                            found.add(word)
+        for word in sorted(found):
+            yield word
+
+
+def plan(sowpods, letters, wildcards, start, end, lengths, tileset=None):
+    """Picks the cheapest engine able to run a query.
+
+    Args:
+        tileset: the TileSet to count in, English if None
+
+    Returns:
+        the string name of the engine to use
+    """
+
+    tileset = tileset or ENGLISH
+    costs = []
+    for name, (_, cost) in sorted(ENGINES.items()):
+        estimate = cost(sowpods, letters, wildcards, start, end, lengths,
+                        tileset)
+        if estimate is not None:
+            costs.append((estimate, name))
+    return min(costs)[1]
+
+
+def search(sowpods, letters, wildcards, start, end, lengths, engine=None,
+           tileset=None):
+    """Finds every word which can be made for a query.
+
+    The engine is picked, and an unknown engine rejected, before the first
+    word is searched for. Words are then found a length at a time as they
+    are consumed.
+
+    Args:
+        engine: the string name of the engine to use, or None to plan one
+        tileset: the TileSet to count in, English if None
+
+    Returns:
+        an iterator of words, ordered by length then alphabetically
+
+    Raises:
+        ValueError if engine is not a registered engine
+    """
+
+    tileset = tileset or ENGLISH
+    if engine is None:
+        engine = plan(sowpods, letters, wildcards, start, end, lengths,
+                      tileset)
+
+    try:
+        engine_search, _ = ENGINES[engine]
+    except KeyError:
+        raise ValueError("Unknown engine: {0}".format(engine))
+
+    return engine_search(sowpods, letters, wildcards, start, end, lengths,
+                         tileset)
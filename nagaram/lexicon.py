@@ -0,0 +1,530 @@
+"""Compact in-memory word lists."""
+
+
+import os
+import bisect
+from array import array
+
+
+_LEXICONS = {}
+_LENGTH_INDEXES = {}
+_ALPHAGRAM_INDEXES = {}
+
+# word list files are split this many bytes at a time while loading
+_READ_BLOCK_SIZE = 1 << 16
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+def wordlist_path(sowpods=False):
+    """Finds the path to a bundled word list file.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+
+    Returns:
+        the string path to the word list file
+
+    Raises:
+        ValueError if sowpods is the name of a word list never installed
+    """
+
+    if isinstance(sowpods, str):
+        raise ValueError("Unknown word list: {0}".format(sowpods))
+
+    location = os.path.join(
+        os.path.dirname(os.path.realpath(__file__)),
+        "wordlists",
+    )
+
+    if sowpods:
+        filename = "sowpods.txt"
+    else:
+        filename = "twl.txt"
+
+    return os.path.join(location, filename)
+
+
+class Lexicon(object):
+    """A sorted list of words packed into a single bytes blob.
+
+    Word i is blob[offsets[i]:offsets[i + 1]], so the whole list costs one
+    bytes object and four bytes per word instead of a str object per word.
+    Words are stored UTF-8 encoded and only decoded as they are accessed.
+    Slicing returns a view sharing the same blob and offsets. The blob and
+    offsets can be any buffers supporting slicing, such as memoryviews of
+    shared memory.
+    """
+
+    def __init__(self, blob, offsets, start=0, stop=None):
+        """Creates a view over words start to stop of blob and offsets.
+
+        Args:
+            blob: the bytes of every word concatenated, in sorted order
+            offsets: an array("I") of word boundaries, one longer than words
+            start: integer index of the first word in this view
+            stop: integer index one past the last word in this view
+        """
+
+        self.blob = blob
+        self.offsets = offsets
+        self.start = start
+        if stop is None:
+            stop = len(offsets) - 1
+        self.stop = stop
+
+    @classmethod
+    def from_words(cls, words):
+        """Packs a sorted iterable of byte strings into a Lexicon."""
+
+        words = list(words)
+        offsets = array("I", [0])
+        total = 0
+        for word in words:
+            total += len(word)
+            offsets.append(total)
+        return cls(b"".join(words), offsets)
+
+    @classmethod
+    def from_file(cls, filepath):
+        """Reads a sorted, whitespace separated word list file into a Lexicon.
+
+        The file is split a block at a time and only the word lengths are
+        kept, so loading never holds an object per word of the whole list.
+        """
+
+        with open(filepath, "rb") as wordfile:
+            data = wordfile.read()
+
+        offsets = array("I", [0])
+        total = 0
+        start = 0
+        size = len(data)
+        while start < size:
+            stop = data.find(b"\n", start + _READ_BLOCK_SIZE)
+            if stop == -1:
+                stop = size
+            for word in data[start:stop].split():
+                total += len(word)
+                offsets.append(total)
+            start = stop
+
+        return cls(data.translate(None, _WHITESPACE), offsets)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __iter__(self):
+        blob = self.blob
+        offsets = self.offsets
+        for index in range(self.start, self.stop):
+            word = blob[offsets[index]:offsets[index + 1]]
+            yield bytes(word).decode("utf-8")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("Lexicon slices must be contiguous")
+            return Lexicon(
+                self.blob,
+                self.offsets,
+                self.start + start,
+                self.start + max(start, stop),
+            )
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Lexicon index out of range")
+        return self.word_bytes(self.start + index).decode("utf-8")
+
+    def word_bytes(self, index):
+        """Returns the raw bytes of the word at absolute index in the blob."""
+
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+    def word_length(self, index):
+        """Returns the length of the word at absolute index in the blob."""
+
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def _bisect(self, prefix, past_prefix=False):
+        """Binary searches for the absolute index of prefix in this view.
+
+        Args:
+            prefix: the bytes prefix to search for
+            past_prefix: a boolean to find the first word after all words
+                         starting with prefix, rather than the first word
+                         greater than or equal to prefix
+
+        Returns:
+            an absolute integer index between start and stop
+        """
+
+        low = self.start
+        high = self.stop
+        size = len(prefix)
+        while low < high:
+            middle = (low + high) // 2
+            word = self.word_bytes(middle)
+            if past_prefix:
+                before = word[:size] <= prefix
+            else:
+                before = word < prefix
+            if before:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def prefix_range(self, prefix):
+        """Finds all words starting with prefix.
+
+        Args:
+            prefix: a string to find words starting with
+
+        Returns:
+            a Lexicon view over only the words starting with prefix
+        """
+
+        try:
+            prefix = prefix.encode("utf-8")
+        except UnicodeError:
+            return Lexicon(self.blob, self.offsets, self.start, self.start)
+
+        return Lexicon(
+            self.blob,
+            self.offsets,
+            self._bisect(prefix),
+            self._bisect(prefix, past_prefix=True),
+        )
+
+
+class LengthIndex(object):
+    """Partitions the words of a Lexicon into buckets by word length.
+
+    The buckets are a single array("I") of word indexes into the Lexicon,
+    ordered by length and then alphabetically, plus the boundaries of each
+    length within it, so bucket n is index[bounds[n]:bounds[n + 1]].
+    """
+
+    def __init__(self, lexicon, index, bounds):
+        """Creates a LengthIndex over lexicon.
+
+        Args:
+            lexicon: the Lexicon the word indexes refer to
+            index: an array("I") of absolute word indexes, grouped by length
+            bounds: an array("I") of the start of each length in index
+        """
+
+        self.lexicon = lexicon
+        self.index = index
+        self.bounds = bounds
+
+    @classmethod
+    def from_lexicon(cls, lexicon, measure=None):
+        """Buckets every word in lexicon by length with a counting sort.
+
+        Args:
+            lexicon: the Lexicon to index
+            measure: a function returning the integer length of a word
+                     string, or None to use the length in bytes
+        """
+
+        if measure is None:
+            lengths = array("I", (
+                lexicon.word_length(position)
+                for position in range(lexicon.start, lexicon.stop)
+            ))
+        else:
+            lengths = array("I", (
+                measure(lexicon.word_bytes(position).decode("utf-8"))
+                for position in range(lexicon.start, lexicon.stop)
+            ))
+
+        counts = []
+        for length in lengths:
+            while len(counts) <= length:
+                counts.append(0)
+            counts[length] += 1
+
+        bounds = array("I", [0])
+        for count in counts:
+            bounds.append(bounds[-1] + count)
+
+        cursors = list(bounds[:-1])
+        index = array("I", [0]) * len(lexicon)
+        for position, length in enumerate(lengths, lexicon.start):
+            index[cursors[length]] = position
+            cursors[length] += 1
+
+        return cls(lexicon, index, bounds)
+
+    @property
+    def longest(self):
+        """The length of the longest word in the index."""
+
+        return len(self.bounds) - 2
+
+    def lengths(self, min_length=None, max_length=None):
+        """Lists the word lengths with words, clipped to the given bounds.
+
+        Args:
+            min_length: integer minimum word length, or None
+            max_length: integer maximum word length, or None
+
+        Returns:
+            a list of integer lengths in ascending order
+        """
+
+        shortest = max(min_length or 0, 0)
+        longest = self.longest
+        if max_length is not None:
+            longest = min(max_length, longest)
+        return [
+            length for length in range(shortest, longest + 1)
+            if self.bounds[length] != self.bounds[length + 1]
+        ]
+
+    def bucket_size(self, length):
+        """Returns the number of words of length."""
+
+        if not 0 <= length <= self.longest:
+            return 0
+        return self.bounds[length + 1] - self.bounds[length]
+
+    def bucket_range(self, length, start, stop):
+        """Finds the words of length within a range of the Lexicon.
+
+        Each bucket keeps its words in Lexicon order, so the range is found
+        with two binary searches rather than by checking every word.
+
+        Args:
+            length: integer word length
+            start: integer absolute index of the first word in the range
+            stop: integer absolute index one past the last word in the range
+
+        Returns:
+            a slice of the index, the absolute word indexes in range
+        """
+
+        if not 0 <= length <= self.longest:
+            return self.index[0:0]
+
+        low = self.bounds[length]
+        high = self.bounds[length + 1]
+        return self.index[bisect.bisect_left(self.index, start, low, high):
+                          bisect.bisect_left(self.index, stop, low, high)]
+
+    def bucket(self, length):
+        """Iterates over the words of length, in alphabetical order.
+
+        Args:
+            length: integer word length
+
+        Yields:
+            each word of length as a string
+        """
+
+        for word in self.bucket_bytes(length):
+            yield word.decode("utf-8")
+
+    def bucket_bytes(self, length):
+        """Iterates over the raw bytes of the words of length.
+
+        Args:
+            length: integer word length
+
+        Yields:
+            each word of length as bytes
+        """
+
+        if not 0 <= length <= self.longest:
+            return
+
+        blob = self.lexicon.blob
+        offsets = self.lexicon.offsets
+        for position in self.index[self.bounds[length]:
+                                   self.bounds[length + 1]]:
+            yield bytes(blob[offsets[position]:offsets[position + 1]])
+
+
+class AlphagramIndex(object):
+    """Groups the words of a Lexicon by their alphagram.
+
+    An alphagram is a word's letters in sorted order, so every anagram of a
+    set of letters shares one. The distinct alphagrams are kept sorted in
+    their own Lexicon, and the words for alphagram n are the word indexes
+    positions[bounds[n]:bounds[n + 1]].
+    """
+
+    def __init__(self, lexicon, alphagrams, bounds, positions):
+        """Creates an AlphagramIndex over lexicon.
+
+        Args:
+            lexicon: the Lexicon the word indexes refer to
+            alphagrams: a Lexicon of every distinct alphagram, sorted
+            bounds: an array("I") of the start of each alphagram in positions
+            positions: an array("I") of absolute word indexes, by alphagram
+        """
+
+        self.lexicon = lexicon
+        self.alphagrams = alphagrams
+        self.bounds = bounds
+        self.positions = positions
+
+    @classmethod
+    def from_lexicon(cls, lexicon):
+        """Sorts every word in lexicon by its alphagram.
+
+        Each word's alphagram, zero padded to the longest word, and its rank
+        in the lexicon are packed into a single integer. Sorting those sorts
+        by alphagram and then alphabetically, with one small object per word
+        and no separate list of keys and order.
+        """
+
+        width = max([0] + [lexicon.word_length(position)
+                           for position in range(lexicon.start,
+                                                 lexicon.stop)])
+        shift = len(lexicon).bit_length()
+        mask = (1 << shift) - 1
+
+        keys = []
+        for rank, position in enumerate(range(lexicon.start, lexicon.stop)):
+            alphagram = bytes(sorted(lexicon.word_bytes(position)))
+            keys.append(int.from_bytes(alphagram.ljust(width, b"\0"),
+                                       "big") << shift | rank)
+        keys.sort()
+
+        blob = bytearray()
+        offsets = array("I", [0])
+        bounds = array("I")
+        positions = array("I")
+        previous = None
+        for key in keys:
+            alphagram = key >> shift
+            if alphagram != previous:
+                previous = alphagram
+                blob += alphagram.to_bytes(width, "big").rstrip(b"\0")
+                offsets.append(len(blob))
+                bounds.append(len(positions))
+            positions.append(lexicon.start + (key & mask))
+        bounds.append(len(positions))
+
+        return cls(lexicon, Lexicon(bytes(blob), offsets), bounds, positions)
+
+    def __len__(self):
+        return len(self.alphagrams)
+
+    def words(self, alphagram):
+        """Finds every word with the given alphagram.
+
+        Args:
+            alphagram: a string of letters in sorted order
+
+        Returns:
+            a list of words in alphabetical order, empty if there are none
+        """
+
+        try:
+            alphagram = alphagram.encode("utf-8")
+        except UnicodeError:
+            return []
+
+        rank = self.alphagrams._bisect(alphagram)
+        if (rank == self.alphagrams.stop or
+                self.alphagrams.word_bytes(rank) != alphagram):
+            return []
+
+        lexicon = self.lexicon
+        return [
+            lexicon.word_bytes(position).decode("utf-8")
+            for position in self.positions[self.bounds[rank]:
+                                           self.bounds[rank + 1]]
+        ]
+
+
+def load_lexicon(sowpods=False):
+    """Loads a bundled word list, once per process.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+
+    Returns:
+        the Lexicon for the word list
+    """
+
+    try:
+        return _LEXICONS[sowpods]
+    except KeyError:
+        lexicon = Lexicon.from_file(wordlist_path(sowpods))
+        _LEXICONS[sowpods] = lexicon
+        return lexicon
+
+
+def load_length_index(sowpods=False):
+    """Loads a bundled word list bucketed by length, once per process.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+
+    Returns:
+        the LengthIndex for the word list
+    """
+
+    try:
+        return _LENGTH_INDEXES[sowpods]
+    except KeyError:
+        length_index = LengthIndex.from_lexicon(load_lexicon(sowpods))
+        _LENGTH_INDEXES[sowpods] = length_index
+        return length_index
+
+
+def alphagram_index_loaded(sowpods=False):
+    """Checks if the alphagram index of a word list is already in memory.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+
+    Returns:
+        True if it was built, installed or attached in this process already
+    """
+
+    return sowpods in _ALPHAGRAM_INDEXES
+
+
+def load_alphagram_index(sowpods=False):
+    """Loads a bundled word list grouped by alphagram, once per process.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+
+    Returns:
+        the AlphagramIndex for the word list
+    """
+
+    try:
+        return _ALPHAGRAM_INDEXES[sowpods]
+    except KeyError:
+        alphagram_index = AlphagramIndex.from_lexicon(load_lexicon(sowpods))
+        _ALPHAGRAM_INDEXES[sowpods] = alphagram_index
+        return alphagram_index
+
+
+def install_indexes(sowpods, lexicon, length_index, alphagram_index):
+    """Replaces the indexes of a bundled word list for this process.
+
+    Used to swap in indexes built elsewhere, eg: attached from shared memory,
+    or to add a word list of another language under a string name.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default),
+                 or the string name of another word list
+        lexicon: the Lexicon for the word list
+        length_index: the LengthIndex over lexicon
+        alphagram_index: the AlphagramIndex over lexicon
+    """
+
+    _LEXICONS[sowpods] = lexicon
+    _LENGTH_INDEXES[sowpods] = length_index
+    _ALPHAGRAM_INDEXES[sowpods] = alphagram_index
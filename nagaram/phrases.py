@@ -0,0 +1,210 @@
+"""Multi-word phrase anagrams, eg: "dormitory" -> "dirty room"."""
+
+
+import itertools
+
+from nagaram.engines import ALPHABET, ENGLISH
+from nagaram.lexicon import load_length_index
+
+
+# each letter count is packed into a 6 bit field of one integer, at its tile
+# number. the top bit of every field is a guard which a subtraction only
+# clears if it borrows
+_FIELD_BITS = 6
+_GUARDS = sum(
+    1 << (_FIELD_BITS * position + _FIELD_BITS - 1)
+    for position in range(len(ALPHABET))
+)
+_MAX_COUNT = (1 << (_FIELD_BITS - 1)) - 1
+
+
+def _pack(letters):
+    """Packs a string of letters into a multiset integer.
+
+    Args:
+        letters: a string of letters from ALPHABET
+
+    Returns:
+        an integer with the count of each letter in its own bit field
+    """
+
+    packed = 0
+    for number in ENGLISH.encode(letters):
+        packed += 1 << (_FIELD_BITS * number)
+    return packed
+
+
+def _contains(packed, other):
+    """Checks if the multiset other fits entirely within packed."""
+
+    return ((packed | _GUARDS) - other) & _GUARDS == _GUARDS
+
+
+def _count(packed, letter):
+    """Returns how many of letter are in the multiset packed."""
+
+    return (packed >> (_FIELD_BITS * letter)) & _MAX_COUNT
+
+
+class _PhraseSearch(object):
+    """The state of one phrase anagram search.
+
+    Candidate words are grouped by alphagram, every alphagram being a single
+    multiset. The solutions for each residual multiset and word count are
+    memoized as sorted tuples of alphagram numbers, so a residual reached by
+    several routes is only ever solved once and word order never produces
+    duplicate phrases.
+    """
+
+    def __init__(self, words):
+        """Groups words by their alphagram.
+
+        Args:
+            words: an iterable of candidate words
+        """
+
+        groups = {}
+        for word in words:
+            groups.setdefault("".join(sorted(word)), []).append(word)
+
+        self.alphagrams = sorted(groups)
+        self.words = [groups[alphagram] for alphagram in self.alphagrams]
+        self.packed = [_pack(alphagram) for alphagram in self.alphagrams]
+        self.single = dict(
+            (packed, number) for number, packed in enumerate(self.packed)
+        )
+
+        self.by_letter = [[] for _ in ALPHABET]
+        for number, alphagram in enumerate(self.alphagrams):
+            for letter in set(ENGLISH.encode(alphagram)):
+                self.by_letter[letter].append(number)
+
+        # the rarest letters have the fewest alphagrams to try
+        self.pivots = sorted(
+            range(len(ALPHABET)),
+            key=lambda letter: len(self.by_letter[letter]),
+        )
+        self.memo = {}
+
+    def solve(self, residual, word_count):
+        """Finds every way to use all of residual in exactly word_count words.
+
+        Args:
+            residual: the packed multiset of letters left to use
+            word_count: the integer number of words to use them in
+
+        Returns:
+            a list of sorted tuples of alphagram numbers
+        """
+
+        if word_count == 1:
+            number = self.single.get(residual)
+            if number is None:
+                return []
+            return [(number,)]
+
+        key = (residual, word_count)
+        try:
+            return self.memo[key]
+        except KeyError:
+            pass
+
+        # whichever letter we pick, some word in the phrase has to use it
+        for pivot in self.pivots:
+            if _count(residual, pivot):
+                break
+
+        found = set()
+        for number in self.by_letter[pivot]:
+            packed = self.packed[number]
+            if packed == residual or not _contains(residual, packed):
+                continue
+            for solution in self.solve(residual - packed, word_count - 1):
+                found.add(tuple(sorted(solution + (number,))))
+
+        solutions = sorted(found)
+        self.memo[key] = solutions
+        return solutions
+
+    def phrases(self, solution):
+        """Expands a solution of alphagram numbers into phrases of words.
+
+        Args:
+            solution: a sorted tuple of alphagram numbers
+
+        Yields:
+            tuples of words, in alphabetical order
+        """
+
+        choices = [
+            itertools.combinations_with_replacement(self.words[number],
+                                                    len(list(repeats)))
+            for number, repeats in itertools.groupby(solution)
+        ]
+        for combination in itertools.product(*choices):
+            yield tuple(sorted(itertools.chain(*combination)))
+
+
+def _candidates(sowpods, letters, lengths):
+    """Finds every word of lengths which can be made from letters.
+
+    Args:
+        sowpods: boolean to declare TWL or SOWPODS words file
+        letters: a list of letters from ALPHABET
+        lengths: a list of the word lengths to search
+
+    Yields:
+        each word which fits within letters
+    """
+
+    length_index = load_length_index(sowpods)
+    available = _pack(letters)
+    others = "".join(set(ALPHABET) - set(letters)).encode("ascii")
+    for length in lengths:
+        for word in length_index.bucket_bytes(length):
+            # cheaply skip words with letters we do not have at all first
+            if len(word.translate(None, others)) != length:
+                continue
+            word = word.decode("ascii")
+            if _contains(available, _pack(word)):
+                yield word
+
+
+def phrase_anagrams(letters, sowpods=False, max_words=3, min_length=2,
+                    limit=None):
+    """Finds phrases of dictionary words using exactly all of letters.
+
+    Args:
+        letters: the string to find phrase anagrams of, anything other than
+                 the letters a to z (such as spaces) is ignored
+        sowpods: boolean to declare TWL or SOWPODS words file
+        max_words: integer maximum number of words in a phrase
+        min_length: integer minimum length of every word in a phrase
+        limit: integer maximum number of phrases to find, or None for all
+
+    Yields:
+        tuples of words in alphabetical order, phrases with fewer words first
+
+    Raises:
+        ValueError if any letter is used more than 31 times
+    """
+
+    letters = [letter for letter in letters.lower() if letter in ALPHABET]
+    if any(letters.count(letter) > _MAX_COUNT for letter in set(letters)):
+        raise ValueError("Too many of one letter in: {0}".format(
+            "".join(letters)))
+    if not letters or limit == 0:
+        return
+
+    lengths = load_length_index(sowpods).lengths(min_length, len(letters))
+    phrase_search = _PhraseSearch(_candidates(sowpods, letters, lengths))
+    total = _pack(letters)
+
+    found = 0
+    for word_count in range(1, max_words + 1):
+        for solution in phrase_search.solve(total, word_count):
+            for phrase in phrase_search.phrases(solution):
+                yield phrase
+                found += 1
+                if found == limit:
+                    return
@@ -1,59 +1,58 @@
 """Scrabble related functions, score counters, etc."""
 
 
-import os
+from nagaram.lexicon import load_lexicon
+from nagaram.tilesets import TILESETS
 
 
-def letter_score(letter):
+# the tiles in a full bag, "_" being the blanks
+LETTERS_IN_BAG = TILESETS["english"].bag()
+
+
+def letter_score(letter, tileset=None):
     """Returns the Scrabble score of a letter.
 
     Args:
-        letter: a single character string
+        letter: a single tile string
+        tileset: the TileSet to score with, English if None
 
     Raises:
         TypeError if a non-Scrabble character is supplied
     """
 
-    score_map = {
-        1: ["a", "e", "i", "o", "u", "l", "n", "r", "s", "t"],
-        2: ["d", "g"],
-        3: ["b", "c", "m", "p"],
-        4: ["f", "h", "v", "w", "y"],
-        5: ["k"],
-        8: ["j", "x"],
-        10: ["q", "z"],
-    }
-
-    for score, letters in score_map.items():
-        if letter.lower() in letters:
-            return score
-    else:
-        raise TypeError("Invalid letter: %s", letter)
+    return (tileset or TILESETS["english"]).letter_score(letter.lower())
 
 
-def word_score(word, input_letters, questions=0):
+def word_score(word, input_letters, questions=0, tileset=None):
     """Checks the Scrabble score of a single word.
 
     Args:
         word: a string to check the Scrabble score of
         input_letters: the letters in our rack
         questions: integer of the tiles already on the board to build on
+        tileset: the TileSet to score with, English if None
 
     Returns:
         an integer Scrabble score amount for the word
+
+    Raises:
+        TypeError if word contains a non-Scrabble character
     """
 
+    tileset = tileset or TILESETS["english"]
+    values = tileset.values
+    rack = tileset.rack_counts(input_letters)
+
     score = 0
     bingo = 0
     filled_by_blanks = []
-    rack = list(input_letters)  # make a copy to speed up find_anagrams()
-    for letter in word:
-        if letter in rack:
+    for tile in tileset.encode(word.lower()):
+        if rack[tile]:
             bingo += 1
-            score += letter_score(letter)
-            rack.remove(letter)
+            score += values[tile]
+            rack[tile] -= 1
         else:
-            filled_by_blanks.append(letter_score(letter))
+            filled_by_blanks.append(values[tile])
 
     # we can have both ?'s and _'s in the word. this will apply the ?s to the
     # highest scrabble score value letters and leave the blanks for low points.
@@ -108,77 +107,24 @@ def word_list(sowpods=False, start="", end=""):
         less if either start or end are used (filtering is applied here)
     """
 
-    location = os.path.join(
-        os.path.dirname(os.path.realpath(__file__)),
-        "wordlists",
-    )
-
-    if sowpods:
-        filename = "sowpods.txt"
-    else:
-        filename = "twl.txt"
-
-    filepath = os.path.join(location, filename)
+    lexicon = load_lexicon(sowpods)
+    if start:
+        lexicon = lexicon.prefix_range(start)
 
-    with open(filepath) as wordfile:
-        for word in wordfile.readlines():
-            word = word.strip()
-            if start and end and word.startswith(start) and word.endswith(end):
-                yield word
-            elif start and word.startswith(start) and not end:
-                yield word
-            elif end and word.endswith(end) and not start:
-                yield word
-            elif not start and not end:
-                yield word
+    for word in lexicon:
+        if not end or word.endswith(end):
+            yield word
 
 
-def valid_scrabble_word(word):
+def valid_scrabble_word(word, tileset=None):
     """Checks if the input word could be played with a full bag of tiles.
 
+    Args:
+        word: the string to check, "_" for blanks and "?" for board tiles
+        tileset: the TileSet of the bag, English if None
+
     Returns:
         True or false
     """
 
-    letters_in_bag = {
-        "a": 9,
-        "b": 2,
-        "c": 2,
-        "d": 4,
-        "e": 12,
-        "f": 2,
-        "g": 3,
-        "h": 2,
-        "i": 9,
-        "j": 1,
-        "k": 1,
-        "l": 4,
-        "m": 2,
-        "n": 6,
-        "o": 8,
-        "p": 2,
-        "q": 1,
-        "r": 6,
-        "s": 4,
-        "t": 6,
-        "u": 4,
-        "v": 2,
-        "w": 2,
-        "x": 1,
-        "y": 2,
-        "z": 1,
-        "_": 2,
-    }
-
-    for letter in word:
-        if letter == "?":
-            continue
-        try:
-            letters_in_bag[letter] -= 1
-        except KeyError:
-            return False
-        if letters_in_bag[letter] < 0:
-            letters_in_bag["_"] -= 1
-            if letters_in_bag["_"] < 0:
-                return False
-    return True
+    return (tileset or TILESETS["english"]).valid_word(word)
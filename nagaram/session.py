@@ -0,0 +1,360 @@
+"""Incremental rack queries, updating the results as single tiles change.
+
+Every word has a deficit, the number of its letters missing from the rack,
+and can be made when its deficit is no more than the blanks and questions
+available. Adding or removing a letter only changes the deficit of the words
+with more of that letter than the rack had, so only those are touched.
+
+The deficits of every word are kept bit sliced: deficit bit n of word i is
+bit i of the integer planes[n]. For each letter and count, which words need
+at least that many of the letter is one more integer bitmask, so updating
+the deficit of every affected word is a handful of big integer operations.
+"""
+
+
+import re
+
+from nagaram.engines import ENGLISH
+from nagaram.lexicon import load_lexicon
+from nagaram.scrabble import word_score
+
+
+_PLANES = 4  # words are at most 15 letters, so deficits fit in 4 bits
+_MASKS = {}
+_BITS = [
+    [bit for bit in range(8) if value & (1 << bit)]
+    for value in range(256)
+]
+_NON_ZERO = re.compile(b"[^\x00]")
+
+
+def _bitmask(positions, size):
+    """Creates an integer with a bit set at each of positions."""
+
+    bitmap = bytearray((size + 7) // 8)
+    for position in positions:
+        bitmap[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bytes(bitmap), "little")
+
+
+def _positions(bitmask):
+    """Yields the position of every set bit in bitmask, in ascending order."""
+
+    data = bitmask.to_bytes((bitmask.bit_length() + 7) // 8, "little")
+    for match in _NON_ZERO.finditer(data):
+        offset = match.start()
+        for bit in _BITS[data[offset]]:
+            yield offset * 8 + bit
+
+
+def _letter_masks(sowpods):
+    """Builds the bitmasks of word letter use and length, once per process.
+
+    Returns:
+        a tuple of:
+            a list of lists of bitmasks by tile number, where bitmask n of a
+            tile is the words using the tile more than n times
+            a list of bitmasks, where bitmask n is the words of length n
+    """
+
+    try:
+        return _MASKS[sowpods]
+    except KeyError:
+        pass
+
+    lexicon = load_lexicon(sowpods)
+    needs = [[] for _ in ENGLISH.tiles]
+    lengths = []
+    for position in range(lexicon.start, lexicon.stop):
+        numbers = ENGLISH.encode(lexicon.word_bytes(position).decode("ascii"))
+        while len(lengths) <= len(numbers):
+            lengths.append([])
+        lengths[len(numbers)].append(position)
+        for number in set(numbers):
+            uses = needs[number]
+            for count in range(numbers.count(number)):
+                if count == len(uses):
+                    uses.append([])
+                uses[count].append(position)
+
+    size = lexicon.stop
+    masks = (
+        [[_bitmask(positions, size) for positions in uses]
+         for uses in needs],
+        [_bitmask(positions, size) for positions in lengths],
+    )
+    _MASKS[sowpods] = masks
+    return masks
+
+
+class RackSession(object):
+    """A rack being edited a tile at a time, and the words it can make.
+
+    The words which can currently be made are kept in results, a dictionary
+    of {word: score}. Every edit returns a diff of the results, a dictionary
+    of:
+        added: a list of (word, score) which can now be made
+        removed: a list of words which can no longer be made
+        changed: a list of (word, score) still made but for a new score
+    """
+
+    def __init__(self, rack="", sowpods=False, start="", end="",
+                 min_length=None, max_length=None):
+        """Creates a session starting from rack.
+
+        Args:
+            rack: the string of tiles to start with
+            sowpods: boolean to declare TWL or SOWPODS words file
+            start: a string of starting characters to find anagrams based on
+            end: a string of ending characters to find anagrams based on
+            min_length: integer minimum length of anagrams to find, or None
+            max_length: integer maximum length of anagrams to find, or None
+        """
+
+        self.sowpods = sowpods
+        self.start = start
+        self.end = end
+        self.min_length = min_length or 0
+        self.max_length = max_length
+
+        self._lexicon = load_lexicon(sowpods)
+        self._needs, self._lengths = _letter_masks(sowpods)
+        self._universe = self._words_between(start, end)
+
+        self._tiles = []
+        self._counts = [0] * len(ENGLISH.tiles)
+        self.blanks = 0
+        self.questions = 0
+
+        # with no letters every word is missing all of its letters
+        self._planes = [0] * _PLANES
+        for uses in self._needs:
+            for mask in uses:
+                self._adjust(mask, 1)
+
+        for letter in start + end:
+            self._count_letter(letter, 1)
+
+        self._matched = 0
+        self.results = {}
+        for tile in rack:
+            self.add(tile)
+
+    def _words_between(self, start, end):
+        """Creates the bitmask of words matching start and end."""
+
+        lexicon = self._lexicon.prefix_range(start)
+        if end:
+            end = end.encode("utf-8")
+            return _bitmask((
+                position for position in range(lexicon.start, lexicon.stop)
+                if lexicon.word_bytes(position).endswith(end)
+            ), self._lexicon.stop)
+        return ((1 << lexicon.stop) - 1) ^ ((1 << lexicon.start) - 1)
+
+    @property
+    def tiles(self):
+        """The string of tiles in the rack, in the order they were added."""
+
+        return "".join(self._tiles)
+
+    @property
+    def wildcards(self):
+        """The integer number of blanks and questions in the rack."""
+
+        return self.blanks + self.questions
+
+    def _letters(self):
+        """Lists the letters available, including start and end."""
+
+        letters = [tile for tile in self._tiles if tile not in "_?"]
+        return letters + list(self.start + self.end)
+
+    def _adjust(self, mask, delta):
+        """Adds delta, 1 or -1, to the deficit of every word in mask."""
+
+        planes = self._planes
+        for plane in range(_PLANES):
+            if not mask:
+                break
+            bits = planes[plane]
+            planes[plane] = bits ^ mask
+            if delta > 0:
+                mask &= bits
+            else:
+                mask &= ~bits
+
+    def _match(self):
+        """Creates the bitmask of words which can currently be made."""
+
+        longest = len(self._letters()) + self.wildcards
+        if self.max_length is not None:
+            longest = min(longest, self.max_length)
+
+        allowed = 0
+        for length in range(self.min_length, min(longest + 1,
+                                                 len(self._lengths))):
+            allowed |= self._lengths[length]
+        allowed &= self._universe
+
+        if self.wildcards >= 1 << _PLANES:
+            return allowed
+
+        # compare the deficits to wildcards from the highest bit down
+        over = 0
+        equal = allowed
+        for plane in reversed(range(_PLANES)):
+            if self.wildcards >> plane & 1:
+                equal &= self._planes[plane]
+            else:
+                over |= equal & self._planes[plane]
+                equal &= ~self._planes[plane]
+        return allowed & ~over
+
+    def _update(self, rescore):
+        """Works out the results which changed after an edit.
+
+        Args:
+            rescore: a bitmask of the words whose score may have changed
+
+        Returns:
+            the diff dictionary
+        """
+
+        matched = self._match()
+        letters = self._letters()
+        diff = {"added": [], "removed": [], "changed": []}
+        word_at = self._lexicon.word_bytes
+
+        for position in _positions(matched & ~self._matched):
+            word = word_at(position).decode("ascii")
+            score = word_score(word, letters, self.questions)
+            self.results[word] = score
+            diff["added"].append((word, score))
+
+        for position in _positions(self._matched & ~matched):
+            word = word_at(position).decode("ascii")
+            del self.results[word]
+            diff["removed"].append(word)
+
+        for position in _positions(self._matched & matched & rescore):
+            word = word_at(position).decode("ascii")
+            score = word_score(word, letters, self.questions)
+            if score != self.results[word]:
+                self.results[word] = score
+                diff["changed"].append((word, score))
+
+        self._matched = matched
+        return diff
+
+    def _count_letter(self, letter, delta):
+        """Counts one more (delta 1) or one less (delta -1) of letter.
+
+        Returns:
+            the bitmask of words with a new deficit
+        """
+
+        number = ENGLISH.number(letter)
+        if number == -1:
+            return 0
+
+        have = self._counts[number]
+        self._counts[number] = have + delta
+        if delta > 0:
+            changed = self._needing(number, have + 1)
+        else:
+            changed = self._needing(number, have)
+        self._adjust(changed, -delta)
+        return changed
+
+    def _add_tile(self, tile):
+        """Adds a tile, returning the bitmask of words now missing less."""
+
+        self._tiles.append(tile)
+        if tile == "_":
+            self.blanks += 1
+            return 0
+        elif tile == "?":
+            self.questions += 1
+            return 0
+
+        return self._count_letter(tile, 1)
+
+    def _remove_tile(self, tile):
+        """Removes a tile, returning the bitmask of words now missing more."""
+
+        self._tiles.remove(tile)
+        if tile == "_":
+            self.blanks -= 1
+            return 0
+        elif tile == "?":
+            self.questions -= 1
+            return 0
+
+        return self._count_letter(tile, -1)
+
+    def _rescore(self, changed, tiles):
+        """Creates the bitmask of words whose score may have changed.
+
+        Args:
+            changed: the bitmask of words with a new deficit
+            tiles: the tiles added or removed
+        """
+
+        # questions score points, so their number changes every word using one
+        if "?" in tiles:
+            for plane in self._planes:
+                changed |= plane
+        return changed
+
+    def add(self, tile):
+        """Adds a tile to the rack.
+
+        Args:
+            tile: a letter, "_" for a blank or "?" for a tile on the board
+
+        Returns:
+            the diff dictionary
+        """
+
+        return self._update(self._rescore(self._add_tile(tile), [tile]))
+
+    def remove(self, tile):
+        """Removes a tile from the rack.
+
+        Args:
+            tile: a letter, "_" for a blank or "?" for a tile on the board
+
+        Returns:
+            the diff dictionary
+
+        Raises:
+            ValueError if tile is not in the rack
+        """
+
+        return self._update(self._rescore(self._remove_tile(tile), [tile]))
+
+    def swap(self, old, new):
+        """Replaces one tile in the rack with another, eg: a letter for "_".
+
+        Args:
+            old: the tile to remove
+            new: the tile to add in its place
+
+        Returns:
+            the diff dictionary of both changes together
+
+        Raises:
+            ValueError if old is not in the rack
+        """
+
+        changed = self._remove_tile(old) | self._add_tile(new)
+        return self._update(self._rescore(changed, [old, new]))
+
+    def _needing(self, number, count):
+        """Creates the bitmask of words using a tile at least count times."""
+
+        uses = self._needs[number]
+        if count > len(uses):
+            return 0
+        return uses[count - 1]
@@ -0,0 +1,369 @@
+"""Word list indexes built once and shared read-only between processes.
+
+The Lexicon, LengthIndex and AlphagramIndex of a word list are flat buffers,
+so they are packed into a single block of shared memory (or a file, which is
+then memory mapped) by one process. Every other process attaches to that
+block and reads the buffers in place, without copying or rebuilding them.
+
+Layout of the block, all integers are native unsigned 64 bit:
+    magic: 8 bytes, MAGIC
+    sowpods: 1 if the block holds the sowpods list, 0 for TWL
+    size and offset of each of the sections, in SECTIONS order
+    the sections, each aligned to 8 bytes
+"""
+
+
+from __future__ import print_function
+
+import os
+import mmap
+import sys
+import time
+import argparse
+from array import array
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    resource_tracker = shared_memory = None
+
+from nagaram.lexicon import (
+    AlphagramIndex,
+    LengthIndex,
+    Lexicon,
+    install_indexes,
+    load_alphagram_index,
+    load_length_index,
+    load_lexicon,
+)
+
+
+MAGIC = b"NAGARAM1"
+SECTIONS = (
+    "blob",
+    "offsets",
+    "length_index",
+    "length_bounds",
+    "alphagram_blob",
+    "alphagram_offsets",
+    "alphagram_bounds",
+    "alphagram_positions",
+)
+
+_HEADER_SIZE = 8 * (2 + 2 * len(SECTIONS))
+
+# keeps attached mmaps open for the life of the process
+_ATTACHED = []
+
+
+def _sections(sowpods):
+    """Lists the buffers to pack for a bundled word list, in SECTIONS order."""
+
+    lexicon = load_lexicon(sowpods)
+    length_index = load_length_index(sowpods)
+    alphagram_index = load_alphagram_index(sowpods)
+    return [
+        lexicon.blob,
+        lexicon.offsets,
+        length_index.index,
+        length_index.bounds,
+        alphagram_index.alphagrams.blob,
+        alphagram_index.alphagrams.offsets,
+        alphagram_index.bounds,
+        alphagram_index.positions,
+    ]
+
+
+def _layout(sowpods):
+    """Works out where every section goes.
+
+    Returns:
+        a tuple of:
+            the integer total size of the block
+            a list of (buffer, offset) tuples for the sections
+            the header, as bytes
+    """
+
+    header = array("Q", [0, int(bool(sowpods))])
+    placed = []
+    position = _HEADER_SIZE
+    for section in _sections(sowpods):
+        data = memoryview(section).cast("B")
+        header.extend([len(data), position])
+        placed.append((data, position))
+        position += len(data) + (-len(data) % 8)
+    return position, placed, MAGIC + header.tobytes()[8:]
+
+
+def _write(target, sowpods):
+    """Writes the packed index for a word list into a writable buffer."""
+
+    _, placed, header = _layout(sowpods)
+    target[:len(header)] = header
+    for data, position in placed:
+        target[position:position + len(data)] = data
+
+
+def index_size(sowpods=False):
+    """Returns the integer number of bytes needed to share a word list."""
+
+    return _layout(sowpods)[0]
+
+
+def create_shared_index(sowpods=False, name=None):
+    """Builds the index of a word list into a new block of shared memory.
+
+    The caller owns the block, it must be kept open while workers use it and
+    unlinked when they are done.
+
+    Args:
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+        name: the string name of the block, or None for a random name
+
+    Returns:
+        the multiprocessing.shared_memory.SharedMemory block
+
+    Raises:
+        RuntimeError if shared memory is not available (Python < 3.8)
+    """
+
+    if shared_memory is None:
+        raise RuntimeError("Shared memory requires Python 3.8 or later")
+
+    block = shared_memory.SharedMemory(
+        name=name,
+        create=True,
+        size=index_size(sowpods),
+    )
+    _write(block.buf, sowpods)
+    return block
+
+
+def write_index_file(path, sowpods=False):
+    """Builds the index of a word list into a file, to be memory mapped.
+
+    Args:
+        path: the string path of the file to write
+        sowpods: a boolean to declare using the sowpods list or TWL (default)
+    """
+
+    data = bytearray(index_size(sowpods))
+    _write(memoryview(data), sowpods)
+    with open(path, "wb") as indexfile:
+        indexfile.write(data)
+
+
+def _list_name(sowpods):
+    """Returns the name of a bundled word list, for messages."""
+
+    return "SOWPODS" if sowpods else "TWL"
+
+
+def _unpack(buf, install, expected, header_only=False):
+    """Creates the indexes over a packed block without copying it.
+
+    Args:
+        buf: a read-only memoryview of the block
+        install: a boolean to declare making these the indexes used by
+                 every search in this process
+        expected: the boolean sowpods the block has to hold, or None for
+                  either word list
+        header_only: a boolean to declare only checking the header
+
+    Returns:
+        a tuple of (sowpods, Lexicon, LengthIndex, AlphagramIndex), or None
+        if header_only
+
+    Raises:
+        ValueError if buf does not hold a packed index, or holds the other
+        word list than expected
+    """
+
+    if len(buf) < _HEADER_SIZE or bytes(buf[:8]) != MAGIC:
+        raise ValueError("Not a nagaram index")
+
+    header = buf[8:_HEADER_SIZE].cast("Q")
+    sowpods = bool(header[0])
+    if expected is not None and sowpods != bool(expected):
+        header.release()
+        raise ValueError("Index holds the {0} word list, not {1}".format(
+            _list_name(sowpods), _list_name(expected)))
+    if header_only:
+        return None
+    sections = {}
+    for number, section in enumerate(SECTIONS):
+        size = header[1 + 2 * number]
+        position = header[2 + 2 * number]
+        sections[section] = buf[position:position + size]
+
+    for section in SECTIONS:
+        if section != "blob" and section != "alphagram_blob":
+            sections[section] = sections[section].cast("I")
+
+    lexicon = Lexicon(sections["blob"], sections["offsets"])
+    length_index = LengthIndex(
+        lexicon,
+        sections["length_index"],
+        sections["length_bounds"],
+    )
+    alphagram_index = AlphagramIndex(
+        lexicon,
+        Lexicon(sections["alphagram_blob"], sections["alphagram_offsets"]),
+        sections["alphagram_bounds"],
+        sections["alphagram_positions"],
+    )
+
+    if install:
+        install_indexes(sowpods, lexicon, length_index, alphagram_index)
+    return sowpods, lexicon, length_index, alphagram_index
+
+
+def _open_block(name):
+    """Opens an existing shared memory block, without taking ownership.
+
+    Raises:
+        RuntimeError if shared memory is not available (Python < 3.8)
+    """
+
+    if shared_memory is None:
+        raise RuntimeError("Shared memory requires Python 3.8 or later")
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13 attaching registers the block for unlinking when
+        # this process exits, it belongs to whoever created it instead
+        block = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(block._name, "shared_memory")
+        return block
+
+
+def check_shared_index(name, sowpods):
+    """Checks a shared memory index holds a word list, without attaching.
+
+    Pool initializers which raise are restarted endlessly, so callers check
+    the block once up front before starting workers attaching to it.
+
+    Args:
+        name: the string name of the block from create_shared_index
+        sowpods: the boolean word list the block has to hold
+
+    Raises:
+        RuntimeError if shared memory is not available (Python < 3.8)
+        ValueError if the block does not hold a packed index, or holds the
+        other word list than sowpods
+    """
+
+    block = _open_block(name)
+    try:
+        header = bytes(block.buf[:_HEADER_SIZE])
+    finally:
+        block.close()
+    _unpack(memoryview(header), False, sowpods, header_only=True)
+
+
+def attach_shared_index(name, install=True, sowpods=None):
+    """Attaches to an index in shared memory, read-only and without copying.
+
+    Suitable as a multiprocessing.Pool initializer, or a post fork hook.
+
+    Args:
+        name: the string name of the block from create_shared_index
+        install: a boolean to declare making these the indexes used by every
+                 search in this process
+        sowpods: the boolean word list the block has to hold, or None to
+                 accept either
+
+    Returns:
+        a tuple of (sowpods, Lexicon, LengthIndex, AlphagramIndex)
+
+    Raises:
+        RuntimeError if shared memory is not available (Python < 3.8)
+        ValueError if the block does not hold a packed index, or holds the
+        other word list than sowpods
+    """
+
+    block = _open_block(name)
+
+    # map the block again read-only, SharedMemory itself maps it writable and
+    # refuses to close while any of our views of it are still alive
+    try:
+        if os.name == "nt":
+            mapped = mmap.mmap(-1, block.size, tagname=block.name,
+                               access=mmap.ACCESS_READ)
+        else:
+            mapped = mmap.mmap(block._fd, block.size, access=mmap.ACCESS_READ)
+    finally:
+        block.close()
+
+    indexes = _unpack(memoryview(mapped), install, sowpods)
+    _ATTACHED.append(mapped)
+    return indexes
+
+
+def attach_index_file(path, install=True, sowpods=None):
+    """Memory maps an index file, read-only and without copying.
+
+    Args:
+        path: the string path of the file from write_index_file
+        install: a boolean to declare making these the indexes used by every
+                 search in this process
+        sowpods: the boolean word list the file has to hold, or None to
+                 accept either
+
+    Returns:
+        a tuple of (sowpods, Lexicon, LengthIndex, AlphagramIndex)
+
+    Raises:
+        ValueError if the file does not hold a packed index, or holds the
+        other word list than sowpods
+    """
+
+    with open(path, "rb") as indexfile:
+        mapped = mmap.mmap(indexfile.fileno(), 0, access=mmap.ACCESS_READ)
+
+    indexes = _unpack(memoryview(mapped), install, sowpods)
+    _ATTACHED.append(mapped)
+    return indexes
+
+
+def main(arguments=None):
+    """Standalone loader, shares an index until interrupted.
+
+    Creates the shared memory block (or writes the index file, with --file)
+    and prints its name for workers to attach to.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m nagaram.shared",
+        description="Shares a nagaram word list index between processes.",
+    )
+    parser.add_argument("--sowpods", action="store_true", default=False)
+    parser.add_argument("--file", action="store_true", default=False,
+                        help="write an index file to mmap instead")
+    parser.add_argument("name", nargs="?", default=None,
+                        help="shared memory block name or file path")
+    settings = parser.parse_args(arguments)
+
+    if settings.file:
+        if not settings.name:
+            parser.error("--file requires a path")
+        write_index_file(settings.name, settings.sowpods)
+        print(os.path.abspath(settings.name))
+        return
+
+    block = create_shared_index(settings.sowpods, settings.name)
+    print(block.name)
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        block.close()
+        block.unlink()
+
+
+if __name__ == "__main__":
+    main()
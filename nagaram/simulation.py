@@ -0,0 +1,230 @@
+"""Monte Carlo rack simulation, drawing random racks from a full bag."""
+
+
+import random
+import functools
+import itertools
+from collections import Counter
+from multiprocessing import Pool
+
+from nagaram.engines import ALPHABET
+from nagaram.lexicon import load_alphagram_index
+from nagaram.scrabble import (
+    LETTERS_IN_BAG,
+    blank_tiles,
+    letter_score,
+    word_score,
+)
+from nagaram.shared import attach_shared_index, check_shared_index
+
+
+def full_bag():
+    """Lists every tile in a full bag, in a stable order.
+
+    Returns:
+        a list of single character strings, "_" being the blanks
+    """
+
+    bag = []
+    for tile, count in sorted(LETTERS_IN_BAG.items()):
+        bag.extend([tile] * count)
+    return bag
+
+
+def draw_racks(samples, seed=None, rack_size=7):
+    """Draws racks at random from a full bag.
+
+    Args:
+        samples: integer number of racks to draw
+        seed: any hashable seed for the random number generator, the same
+              seed always draws the same racks
+        rack_size: integer number of tiles per rack
+
+    Yields:
+        each rack as a string of tiles in sorted order
+    """
+
+    rng = random.Random(seed)
+    sample = rng.sample
+    bag = full_bag()
+    for _ in range(samples):
+        yield "".join(sorted(sample(bag, rack_size)))
+
+
+def _value(letter):
+    """Returns the score of a rack letter, 0 for anything not a letter."""
+
+    try:
+        return letter_score(letter)
+    except TypeError:
+        return 0
+
+
+def solve_rack(rack, sowpods=False):
+    """Finds the best play for a rack.
+
+    Only the best play is needed, not every anagram, so the rack is solved
+    straight from the alphagram index. Sub-multisets of the rack's letters
+    are looked up from the largest down, each with every fill of its
+    wildcards, and the search stops once no smaller sub-multiset could score
+    as much as the best play found so far.
+
+    Args:
+        rack: a string of tiles
+        sowpods: boolean to declare TWL or SOWPODS words file
+
+    Returns:
+        a tuple of:
+            the rack
+            the integer score of the best play, 0 if there are none
+            the best play, highest score then alphabetically, or None
+            a boolean to declare if any play uses every tile in the rack
+    """
+
+    letters, blanks, questions = blank_tiles(rack)
+    wildcards = blanks + questions
+    alphagram_index = load_alphagram_index(sowpods)
+    counts = sorted(Counter(letters).items())
+    fills = [
+        ["".join(fill) for fill in
+         itertools.combinations_with_replacement(ALPHABET, used)]
+        for used in range(wildcards + 1)
+    ]
+
+    # the most a play built on n of the letters can score, questions can
+    # only ever fill in for the highest value tile
+    values = sorted((_value(letter) for letter in letters), reverse=True)
+    highest = max(_value(letter) for letter in ALPHABET)
+    bonus = [highest * questions + 50 * (size > 6)
+             for size in range(len(letters) + 1)]
+    bounds = [sum(values[:size]) + bonus[size] for size in range(len(bonus))]
+
+    # every sub-multiset of the letters, in sorted order, by size
+    subsets = [[] for _ in bounds]
+    for taken in itertools.product(*[range(count + 1) for _, count in counts]):
+        subsets[sum(taken)].append("".join(
+            letter * count for (letter, _), count in zip(counts, taken)))
+
+    best_score = 0
+    best_word = None
+    bingo = False
+    seen = set()
+    for size in range(len(letters), -1, -1):
+        if best_word is not None and bounds[size] < best_score:
+            break
+        for subset in subsets[size]:
+            if (best_word is not None and best_score > bonus[size] +
+                    sum(_value(letter) for letter in subset)):
+                continue
+            for used in range(wildcards + 1):
+                for fill in fills[used]:
+                    alphagram = "".join(sorted(subset + fill))
+                    if alphagram in seen:
+                        continue
+                    seen.add(alphagram)
+
+                    words = alphagram_index.words(alphagram)
+                    if not words:
+                        continue
+                    if len(alphagram) == len(rack):
+                        bingo = True
+                    score = word_score(words[0], letters, questions)
+                    if (best_word is None or score > best_score or
+                            (score == best_score and words[0] < best_word)):
+                        best_score = score
+                        best_word = words[0]
+
+    return rack, best_score, best_word, bingo
+
+
+def simulate(samples, seed=None, sowpods=False, rack_size=7, workers=1,
+             batch_size=100000, top=10, shared_index=None):
+    """Estimates best play statistics over randomly drawn racks.
+
+    Racks are drawn batch_size at a time and deduplicated, so each distinct
+    rack is only solved once per run however often it is drawn. The distinct
+    racks of a batch are solved across workers processes. The results only
+    depend on the seed, not on the number of workers or the batch size.
+
+    A 7 tile rack takes about 1ms to solve on average (under 1ms without
+    blanks, a few ms with one and around 15ms with both), so the roughly 3
+    million distinct 7 tile racks take about an hour of single process time.
+
+    Args:
+        samples: integer number of racks to draw
+        seed: any hashable seed for the random number generator
+        sowpods: boolean to declare TWL or SOWPODS words file
+        rack_size: integer number of tiles per rack
+        workers: integer number of processes to solve racks with
+        batch_size: integer number of racks to draw at a time
+        top: integer number of the most frequent best plays to report
+        shared_index: string name of a shared memory index for the workers to
+                      attach to, from nagaram.shared.create_shared_index,
+                      holding the same word list as sowpods
+
+    Returns:
+        a dictionary of:
+            samples: the integer number of racks drawn
+            unique_racks: the integer number of distinct racks solved
+            mean_best_score: the mean score of the best play per rack
+            bingo_rate: the fraction of racks with a play using every tile
+            no_play_rate: the fraction of racks without any play
+            top_plays: a list of (word, count) of the most frequent best plays
+    """
+
+    solved = {}
+    best_plays = Counter()
+    total_score = 0
+    bingos = 0
+    no_plays = 0
+
+    solve = functools.partial(solve_rack, sowpods=sowpods)
+    pool = None
+    if workers > 1 and shared_index:
+        check_shared_index(shared_index, sowpods)
+        pool = Pool(workers, attach_shared_index,
+                    (shared_index, True, sowpods))
+    elif workers > 1:
+        pool = Pool(workers)
+
+    try:
+        racks = draw_racks(samples, seed, rack_size)
+        while True:
+            drawn = Counter(itertools.islice(racks, batch_size))
+            if not drawn:
+                break
+
+            unsolved = [rack for rack in drawn if rack not in solved]
+            if pool is None:
+                results = map(solve, unsolved)
+            else:
+                chunksize = max(1, len(unsolved) // (workers * 16))
+                results = pool.imap_unordered(solve, unsolved, chunksize)
+            for rack, best_score, best_word, bingo in results:
+                solved[rack] = (best_score, best_word, bingo)
+
+            for rack, count in drawn.items():
+                best_score, best_word, bingo = solved[rack]
+                total_score += best_score * count
+                if bingo:
+                    bingos += count
+                if best_word is None:
+                    no_plays += count
+                else:
+                    best_plays[best_word] += count
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return {
+        "samples": samples,
+        "unique_racks": len(solved),
+        "mean_best_score": float(total_score) / samples if samples else 0.0,
+        "bingo_rate": float(bingos) / samples if samples else 0.0,
+        "no_play_rate": float(no_plays) / samples if samples else 0.0,
+        "top_plays": sorted(
+            best_plays.items(),
+            key=lambda play: (-play[1], play[0]),
+        )[:top],
+    }
@@ -0,0 +1,429 @@
+#coding: utf-8
+"""Tile sets, the letters, values and counts of tiles in other languages.
+
+A tile set is defined as text, one tile per line of: tile value count. Tiles
+can be more than one character (eg: the Spanish "ch"), "_" defines the number
+of blanks and anything after a "#" is a comment.
+
+Definitions are compiled into a TileSet, which numbers every tile and keeps
+their values and counts in plain lists indexed by that number. Words are
+encoded into tile numbers once, after which scoring and counting them are
+only list lookups.
+
+Only English word lists are bundled. A word list in another language is
+installed by name with install_word_list, then searched like the bundled
+ones by passing its name and tileset to nagaram.anagrams.tile_anagrams.
+"""
+
+
+from nagaram.lexicon import (
+    AlphagramIndex,
+    LengthIndex,
+    Lexicon,
+    install_indexes,
+)
+
+
+BLANK = "_"
+QUESTION = "?"
+
+ENGLISH = """
+# tile value count
+a 1 9
+b 3 2
+c 3 2
+d 2 4
+e 1 12
+f 4 2
+g 2 3
+h 4 2
+i 1 9
+j 8 1
+k 5 1
+l 1 4
+m 3 2
+n 1 6
+o 1 8
+p 3 2
+q 10 1
+r 1 6
+s 1 4
+t 1 6
+u 1 4
+v 4 2
+w 4 2
+x 8 1
+y 4 2
+z 10 1
+_ 0 2
+"""
+
+FRENCH = """
+a 1 9
+b 3 2
+c 3 2
+d 2 3
+e 1 15
+f 4 2
+g 2 2
+h 4 2
+i 1 8
+j 8 1
+k 10 1
+l 1 5
+m 2 3
+n 1 6
+o 1 6
+p 3 2
+q 8 1
+r 1 6
+s 1 6
+t 1 6
+u 1 6
+v 4 2
+w 10 1
+x 10 1
+y 10 1
+z 10 1
+_ 0 2
+"""
+
+SPANISH = """
+a 1 12
+b 3 2
+c 3 4
+ch 5 1
+d 2 5
+e 1 12
+f 4 1
+g 2 2
+h 4 2
+i 1 6
+j 8 1
+l 1 4
+ll 8 1
+m 3 2
+n 1 5
+ñ 8 1
+o 1 9
+p 3 2
+q 5 1
+r 1 5
+rr 8 1
+s 1 6
+t 1 4
+u 1 5
+v 4 1
+x 8 1
+y 4 1
+z 10 1
+_ 0 2
+"""
+
+DUTCH = """
+a 1 6
+b 3 2
+c 5 2
+d 2 5
+e 1 18
+f 4 2
+g 3 3
+h 4 2
+i 1 4
+j 4 2
+k 3 3
+l 3 3
+m 3 3
+n 1 10
+o 1 6
+p 3 2
+q 10 1
+r 2 5
+s 2 5
+t 2 5
+u 4 3
+v 4 2
+w 5 2
+x 8 1
+y 8 1
+z 4 2
+_ 0 2
+"""
+
+
+class TileSet(object):
+    """A compiled tile set.
+
+    Every tile is numbered in the order it was defined. values[n] and
+    counts[n] are the score and the number in the bag of tile n.
+    """
+
+    def __init__(self, name, tiles, values, counts, blanks):
+        """Creates a TileSet.
+
+        Args:
+            name: the string name of the tile set
+            tiles: a list of tile strings, in tile number order
+            values: a list of integer tile values, in tile number order
+            counts: a list of integer tile counts, in tile number order
+            blanks: the integer number of blank tiles
+        """
+
+        self.name = name
+        self.tiles = tuple(tiles)
+        self.values = list(values)
+        self.counts = list(counts)
+        self.blanks = blanks
+
+        self._numbers = dict((tile, number) for number, tile in
+                             enumerate(self.tiles))
+        self._sizes = sorted(set(len(tile) for tile in self.tiles),
+                             reverse=True)
+
+        # single character tiles are looked up directly by character code
+        singles = [tile for tile in self.tiles if len(tile) == 1]
+        self._by_code = [-1] * (max([ord(tile) for tile in singles] + [0]) + 1)
+        for tile in singles:
+            self._by_code[ord(tile)] = self._numbers[tile]
+
+    def __repr__(self):
+        return "<TileSet {0}>".format(self.name)
+
+    def number(self, tile):
+        """Returns the number of tile, or -1 if it is not a tile."""
+
+        return self._numbers.get(tile, -1)
+
+    def _single(self, letter):
+        """Returns the number of the single character tile letter, or -1."""
+
+        code = ord(letter)
+        if code < len(self._by_code):
+            return self._by_code[code]
+        return -1
+
+    def _split(self, word, strict=True):
+        """Splits word into tile numbers, longest tiles first.
+
+        Args:
+            word: a string of tiles
+            strict: a boolean to declare raising on characters which are not
+                    tiles, rather than skipping them
+
+        Yields:
+            integer tile numbers
+
+        Raises:
+            TypeError if strict and word has characters which are not tiles
+        """
+
+        position = 0
+        while position < len(word):
+            for size in self._sizes:
+                if size == 1:
+                    number = self._single(word[position])
+                else:
+                    number = self._numbers.get(
+                        word[position:position + size], -1)
+                if number != -1:
+                    yield number
+                    position += size
+                    break
+            else:
+                if strict:
+                    raise TypeError("Invalid letter in: {0}".format(word))
+                position += 1
+
+    def encode(self, word):
+        """Splits a word into tile numbers, longest tiles first.
+
+        Args:
+            word: a string of tiles
+
+        Returns:
+            a list of integer tile numbers
+
+        Raises:
+            TypeError if the word has characters which are not tiles
+        """
+
+        if self._sizes == [1]:
+            by_code = self._by_code
+            size = len(by_code)
+            numbers = [by_code[code] if code < size else -1
+                       for code in map(ord, word)]
+            if -1 in numbers:
+                raise TypeError("Invalid letter in: {0}".format(word))
+            return numbers
+        return list(self._split(word))
+
+    def word_length(self, word):
+        """Returns the number of tiles in word.
+
+        Raises:
+            TypeError if the word has characters which are not tiles
+        """
+
+        return len(self.encode(word))
+
+    def rack_counts(self, letters):
+        """Counts the tiles in a rack, ignoring anything which is not a tile.
+
+        Args:
+            letters: a string, or a list of strings each split into tiles on
+                     their own, so ["c", "h"] is never the tile "ch"
+
+        Returns:
+            a list of integer counts, in tile number order
+        """
+
+        if isinstance(letters, str):
+            letters = [letters]
+
+        counts = [0] * len(self.tiles)
+        for letter in letters:
+            for number in self._split(letter, strict=False):
+                counts[number] += 1
+        return counts
+
+    def letter_score(self, letter):
+        """Returns the value of a single tile.
+
+        Raises:
+            TypeError if letter is not a tile
+        """
+
+        number = self._numbers.get(letter)
+        if number is None:
+            raise TypeError("Invalid letter: {0}".format(letter))
+        return self.values[number]
+
+    def face_value(self, word):
+        """Returns the total value of the tiles in word, without bonuses."""
+
+        values = self.values
+        return sum(values[number] for number in self.encode(word))
+
+    def bag(self):
+        """Returns a dictionary of {tile: count}, with "_" for blanks."""
+
+        bag = dict(zip(self.tiles, self.counts))
+        bag[BLANK] = self.blanks
+        return bag
+
+    def valid_word(self, word):
+        """Checks if word could be played with a full bag of tiles.
+
+        Args:
+            word: a string of tiles, "_" for blanks and "?" for tiles already
+                  on the board
+
+        Returns:
+            True or False
+        """
+
+        blanks = self.blanks - word.count(BLANK)
+        word = word.replace(BLANK, "").replace(QUESTION, "")
+        try:
+            numbers = self.encode(word)
+        except TypeError:
+            return False
+
+        counts = list(self.counts)
+        for number in numbers:
+            counts[number] -= 1
+            if counts[number] < 0:
+                blanks -= 1
+        return blanks >= 0
+
+
+def compile_tileset(definition, name="custom"):
+    """Compiles a tile set definition.
+
+    Args:
+        definition: the string definition, one "tile value count" per line
+        name: the string name of the tile set
+
+    Returns:
+        the TileSet
+
+    Raises:
+        ValueError if the definition is invalid
+    """
+
+    tiles = []
+    values = []
+    counts = []
+    blanks = 0
+    for number, line in enumerate(definition.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        try:
+            tile, value, count = line.split()
+            value = int(value)
+            count = int(count)
+        except ValueError:
+            raise ValueError("Invalid tile on line {0}: {1}".format(
+                number, line))
+
+        if value < 0 or count < 0 or QUESTION in tile:
+            raise ValueError("Invalid tile on line {0}: {1}".format(
+                number, line))
+        if tile in tiles or (tile == BLANK and blanks):
+            raise ValueError("Duplicate tile on line {0}: {1}".format(
+                number, tile))
+
+        if tile == BLANK:
+            blanks = count
+        else:
+            tiles.append(tile)
+            values.append(value)
+            counts.append(count)
+
+    if not tiles:
+        raise ValueError("No tiles defined")
+
+    return TileSet(name, tiles, values, counts, blanks)
+
+
+TILESETS = dict(
+    (name, compile_tileset(definition, name))
+    for name, definition in (
+        ("english", ENGLISH),
+        ("french", FRENCH),
+        ("spanish", SPANISH),
+        ("dutch", DUTCH),
+    )
+)
+
+
+def install_word_list(name, words, tileset):
+    """Indexes a word list in another language, for the search engines.
+
+    The word list is searched by passing its name wherever a search takes
+    sowpods, along with its tileset. Word lengths are counted in tiles.
+
+    Args:
+        name: the string name to install the word list as
+        words: an iterable of word strings, words with characters which are
+               not tiles in tileset are skipped
+        tileset: the TileSet of the word list's language
+    """
+
+    encoded = set()
+    for word in words:
+        try:
+            tileset.encode(word)
+        except TypeError:
+            continue
+        encoded.add(word.encode("utf-8"))
+
+    lexicon = Lexicon.from_words(sorted(encoded))
+    install_indexes(
+        name,
+        lexicon,
+        LengthIndex.from_lexicon(lexicon, tileset.word_length),
+        AlphagramIndex.from_lexicon(lexicon),
+    )
@@ -59,12 +59,15 @@ setup(
     tests_require=['pytest', 'pytest-cov'],
     cmdclass={'test': PyTest},
     license="BSD",
+    python_requires=">=3.6",
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Environment :: Console',
         'Intended Audience :: End Users/Desktop',
         "License :: OSI Approved :: BSD License",
         'Operating System :: OS Independent',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
         'Topic :: Games/Entertainment',
         'Topic :: Utilities',
     ],
@@ -56,3 +56,30 @@ def test_anagrams_in_word(word, sowpods, start, end, expected):
 
     for scored_anagram in expected:
         assert scored_anagram in received
+
+
+@pytest.mark.parametrize(
+    "min_length,max_length,expected",
+    (
+        (3, None, ["dor", "dow", "rod", "row", "word"]),
+        (None, 2, ["do", "od", "or", "ow", "wo"]),
+        (3, 3, ["dor", "dow", "rod", "row"]),
+        (5, None, []),
+        (4, 2, []),
+    ),
+    ids=("min", "max", "both", "too_long", "empty"),
+)
+def test_anagram_lengths(min_length, max_length, expected):
+    """Only anagrams within the requested lengths should be found."""
+
+    received = anagrams_in_word("word", min_length=min_length,
+                                max_length=max_length)
+    assert sorted(word for word, _ in received) == expected
+
+
+def test_anagrams_grouped_by_length():
+    """Anagrams come out a length at a time, shortest first."""
+
+    lengths = [len(word) for word, _ in anagrams_in_word("so?e_h")]
+    assert lengths == sorted(lengths)
+    assert lengths[-1] == 6
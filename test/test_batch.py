@@ -0,0 +1,106 @@
+"""Tests for batch rack processing."""
+
+
+import io
+import json
+
+import pytest
+
+from nagaram.batch import batch_anagrams, parse_rack, solve_rack, write_jsonl
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    (
+        ("word", ("word", "", "")),
+        ("  word\n", ("word", "", "")),
+        ("word b", ("word", "b", "")),
+        ("word b d", ("word", "b", "d")),
+        ('{"letters": "word", "end": "d"}', ("word", "", "d")),
+        ("", None),
+        ("\n", None),
+    ),
+    ids=("basic", "whitespace", "start", "both", "json", "empty", "newline"),
+)
+def test_parse_rack(line, expected):
+    """Ensure we're parsing batch input lines correctly."""
+
+    assert parse_rack(line) == expected
+
+
+def test_parse_rack_defaults():
+    """Per-line start and end should override the defaults."""
+
+    assert parse_rack("word", "b", "d") == ("word", "b", "d")
+    assert parse_rack("word s", "b", "d") == ("word", "s", "d")
+    assert parse_rack('{"letters": "word", "start": ""}', "b", "d") == (
+        "word", "", "d")
+
+
+@pytest.mark.parametrize(
+    "line",
+    (
+        "word a b c",
+        '{"start": "a"}',
+        '{"letters": ',
+        '{"letters": "word", "start": null}',
+        '{"letters": ["w", "o"]}',
+        '{"letters": "word", "end": 4}',
+    ),
+    ids=("too_many_fields", "no_letters", "bad_json", "null_start",
+         "list_letters", "number_end"),
+)
+def test_parse_rack_invalid(line):
+    """Unparseable lines should raise ValueError."""
+
+    with pytest.raises(ValueError):
+        parse_rack(line)
+
+
+def test_solve_rack():
+    """Results should be sorted by score, then alphabetically."""
+
+    result = solve_rack(("word", "b", "d"), sowpods=True)
+    assert result == {
+        "letters": "word",
+        "start": "b",
+        "end": "d",
+        "valid": True,
+        "anagrams": [["bord", 7], ["brod", 7], ["bod", 6]],
+    }
+
+
+@pytest.mark.parametrize("workers", (1, 2), ids=("serial", "parallel"))
+def test_batch_preserves_order(workers):
+    """Results should come back in input order regardless of workers."""
+
+    racks = ["word", "", "cat", "word b d", "dog", "zzz", "act s"]
+    expected = [solve_rack(parse_rack(rack)) for rack in racks if rack]
+    received = list(batch_anagrams(racks, workers=workers, buffer_size=2))
+    assert received == expected
+
+
+@pytest.mark.parametrize("workers", (1, 2), ids=("serial", "parallel"))
+def test_batch_bad_lines(workers):
+    """Bad lines become error records in place, the batch carries on."""
+
+    racks = ["word", '{"letters": "cat", "start": null}', "", "a b c d",
+             "dog"]
+    received = list(batch_anagrams(racks, workers=workers, buffer_size=2))
+
+    assert len(received) == 4
+    assert received[0] == solve_rack(parse_rack("word"))
+    assert received[1]["line"] == 2
+    assert "strings" in received[1]["error"]
+    assert received[2]["line"] == 4
+    assert "Too many fields" in received[2]["error"]
+    assert received[3] == solve_rack(parse_rack("dog"))
+
+
+def test_write_jsonl():
+    """One JSON object per line."""
+
+    output = io.StringIO()
+    write_jsonl(batch_anagrams(["word", "cat"]), output)
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line)["letters"] for line in lines] == ["word", "cat"]
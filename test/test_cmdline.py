@@ -1,12 +1,19 @@
 """Tests for argument parsing and string output formatting."""
 
 
+import io
 import sys
 import pytest
 
 import nagaram
 from nagaram.anagrams import anagrams_in_word
-from nagaram.cmdline import pretty_print, argument_parser, main
+from nagaram.cmdline import (
+    Options,
+    argument_parser,
+    main,
+    parse_options,
+    pretty_print,
+)
 
 
 @pytest.mark.parametrize(
@@ -73,6 +80,24 @@ def test_print_word_by_length(sowpods, expected_output, capfd):
         assert line in stdout
 
 
+def test_print_by_length_merges_buckets(capfd):
+    """Words of the same length should be printed together in any order."""
+
+    anagrams = [("dow", 7), ("do", 3), ("row", 6), ("wo", 5)]
+    pretty_print("word", iter(anagrams), by_length=True)
+    stdout, _ = capfd.readouterr()
+    assert "3 tiles: dow (7), row (6)" in stdout
+    assert "2 tiles: do (3), wo (5)" in stdout
+
+
+def test_print_score_line_alphabetical(capfd):
+    """Words of different lengths on one score line print alphabetically."""
+
+    pretty_print("demo", anagrams_in_word("demo"))
+    stdout, _ = capfd.readouterr()
+    assert "4 points: doe, em, me, mo, ode, om" in stdout
+
+
 def test_print_invalid_word(capfd):
     """Ensure we inform the user their starting word was invalid."""
 
@@ -83,23 +108,51 @@ def test_print_invalid_word(capfd):
 
 
 @pytest.mark.parametrize(
-    "args,expected_output",
+    "args,expected_options",
     (
-        (["word"], (["word"], False, False, "", "")),
-        (["--sowpods", "word"], (["word"], True, False, "", "")),
-        (["-l", "word"], (["word"], False, True, "", "")),
-        (["-s", "ok", "word"], (["word"], False, False, "ok", "")),
-        (["--ends-with", "ok", "word"], (["word"], False, False, "", "ok")),
-        (["some", "word", "and", "others"], (["some", "word", "and", "others"],
-            False, False, "", "")),
+        (["word"], {}),
+        (["--sowpods", "word"], {"sowpods": True}),
+        (["-l", "word"], {"by_length": True}),
+        (["-s", "ok", "word"], {"start": "ok"}),
+        (["--ends-with", "ok", "word"], {"end": "ok"}),
+        (["some", "word", "and", "others"],
+         {"wordlist": ["some", "word", "and", "others"]}),
+        (["-i", "racks.txt"], {"wordlist": [], "input": "racks.txt"}),
+        (["--min-length", "3", "--max-length", "5", "word"],
+         {"min_length": 3, "max_length": 5}),
+        (["--engine", "scan", "word"], {"engine": "scan"}),
+        (["-i", "-", "-o", "out.jsonl", "-w", "4"],
+         {"wordlist": [], "input": "-", "output": "out.jsonl", "workers": 4}),
     ),
-    ids=("basic", "sowpods", "by_length", "start", "end", "multiword"),
+    ids=("basic", "sowpods", "by_length", "start", "end", "multiword",
+         "input", "lengths", "engine", "batch"),
 )
-def test_arg_parsing(args, expected_output):
-    """Test cmd line parsing."""
-
-    for received, expected in zip(argument_parser(args), expected_output):
-        assert received == expected
+def test_arg_parsing(args, expected_options):
+    """Test cmd line parsing, every option not given keeps its default."""
+
+    expected = Options(
+        wordlist=["word"],
+        sowpods=False,
+        by_length=False,
+        start="",
+        end="",
+        input=None,
+        output=None,
+        workers=1,
+        min_length=None,
+        max_length=None,
+        engine=None,
+    )._replace(**expected_options)
+    assert parse_options(args) == expected
+
+
+def test_arg_parsing_tuple():
+    """argument_parser still returns the original five options."""
+
+    wordlist, sowpods, by_length, start, end = argument_parser(
+        ["--sowpods", "-l", "-s", "a", "-e", "b", "-w", "2", "word"])
+    assert (wordlist, sowpods, by_length, start, end) == (
+        ["word"], True, True, "a", "b")
 
 
 @pytest.mark.parametrize("arg", ("-v", "--version"), ids=("short", "long"))
@@ -186,3 +239,44 @@ def test_main_without_args(capfd):
     stdout, _ = capfd.readouterr()
     for line in expected_output:
         assert line in stdout
+
+
+def test_main_with_lengths(capfd):
+    """Length limits should be applied to the anagrams printed."""
+
+    main(["--min-length", "3", "--max-length", "3", "word"])
+    stdout, _ = capfd.readouterr()
+    assert "7 points: dow" in stdout
+    assert "8 points" not in stdout
+    assert "5 points" not in stdout
+
+
+def test_unknown_engine_exits():
+    """Only registered engines should be accepted."""
+
+    with pytest.raises(SystemExit):
+        parse_options(["--engine", "magic", "word"])
+
+
+def test_main_batch(tmpdir):
+    """Batch mode should read racks from a file and write JSON lines."""
+
+    racks = tmpdir.join("racks.txt")
+    racks.write("word\nword b d\n")
+    output = tmpdir.join("out.jsonl")
+
+    main(["-i", str(racks), "-o", str(output)])
+
+    lines = output.read().splitlines()
+    assert len(lines) == 2
+    assert '["word", 8]' in lines[0]
+    assert '"anagrams": [["bod", 6]]' in lines[1]
+
+
+def test_main_batch_stdin(monkeypatch, capfd):
+    """Batch input can come from stdin, output defaults to stdout."""
+
+    monkeypatch.setattr(sys, "stdin", io.StringIO("word\n"))
+    main(["-i", "-"])
+    stdout, _ = capfd.readouterr()
+    assert stdout.startswith('{"anagrams": [["word", 8]')
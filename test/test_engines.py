@@ -0,0 +1,120 @@
+"""Tests for the anagram search engines and the planner."""
+
+
+import pytest
+
+from nagaram.anagrams import anagrams_in_word, compare_engines
+from nagaram.engines import ENGINES, REFERENCE_ENGINE, plan, search
+from nagaram.lexicon import alphagram_index_loaded, load_alphagram_index
+
+
+RACKS = (
+    ("word", "", ""),
+    ("retains", "", ""),
+    ("retain_", "", ""),
+    ("q?i", "", ""),
+    ("eeeeee", "", ""),
+    ("zzz__", "", ""),
+    ("word", "b", "d"),
+    ("tion", "", "ing"),
+    ("ab?", "un", ""),
+    ("xyz", "", ""),
+    ("", "", ""),
+    ("vin_diesel", "", ""),
+)
+
+
+@pytest.mark.parametrize("sowpods", (False, True), ids=("twl", "sowpods"))
+@pytest.mark.parametrize(
+    "word,start,end",
+    RACKS,
+    ids=["{0}|{1}|{2}".format(*rack) for rack in RACKS],
+)
+def test_engines_agree(word, sowpods, start, end):
+    """Every engine should find exactly what the reference engine finds."""
+
+    assert compare_engines(word, sowpods, start, end) == {}
+
+
+@pytest.mark.parametrize(
+    "min_length,max_length",
+    ((3, None), (None, 4), (5, 5)),
+    ids=("min", "max", "both"),
+)
+def test_engines_agree_on_lengths(min_length, max_length):
+    """Length limits should be respected the same way by every engine."""
+
+    assert compare_engines("tinsel_", min_length=min_length,
+                           max_length=max_length) == {}
+
+
+def test_reference_engine_registered():
+    """The reference engine has to exist to compare against."""
+
+    assert REFERENCE_ENGINE in ENGINES
+    assert set(ENGINES) >= set(["alphagram", "prefix", "scan"])
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_engine_override(engine):
+    """Forcing an engine should give the same scored results."""
+
+    assert list(anagrams_in_word("word", engine=engine)) == [
+        ("do", 3),
+        ("od", 3),
+        ("or", 2),
+        ("ow", 5),
+        ("wo", 5),
+        ("dor", 4),
+        ("dow", 7),
+        ("rod", 4),
+        ("row", 6),
+        ("word", 8),
+    ]
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_engines_stream_in_order(engine):
+    """Engines yield a length at a time, alphabetically within a length."""
+
+    query = (False, list("retainun"), 1, "un", "", list(range(2, 10)))
+    results = search(*query, engine=engine)
+    assert not isinstance(results, list)
+
+    words = list(results)
+    assert words
+    assert words == sorted(words, key=lambda word: (len(word), word))
+    assert words == list(search(*query, engine=REFERENCE_ENGINE))
+
+
+def test_unknown_engine():
+    """Unknown engines should raise ValueError."""
+
+    with pytest.raises(ValueError):
+        list(anagrams_in_word("word", engine="magic"))
+
+
+@pytest.mark.parametrize(
+    "letters,wildcards,start,expected",
+    (
+        (list("retains"), 0, "", "alphagram"),
+        (list("aeinrst"), 2, "", "scan"),
+        (list("aeinrstun"), 2, "un", "prefix"),
+    ),
+    ids=("plain_rack", "wildcards", "prefix"),
+)
+def test_plan(letters, wildcards, start, expected):
+    """The planner should pick the cheapest engine for the query shape."""
+
+    load_alphagram_index(True)
+    lengths = list(range(2, len(letters) + wildcards + 1))
+    assert plan(True, letters, wildcards, start, "", lengths) == expected
+
+
+def test_plan_counts_building_the_index(monkeypatch):
+    """A one-off search should scan rather than build the alphagram index."""
+
+    monkeypatch.setattr("nagaram.lexicon._ALPHAGRAM_INDEXES", {})
+    lengths = list(range(2, 8))
+    assert plan(True, list("retains"), 0, "", "", lengths) == "scan"
+    assert not alphagram_index_loaded(True)
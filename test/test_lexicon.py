@@ -0,0 +1,210 @@
+#coding: utf-8
+"""Tests for the compact word list storage."""
+
+
+import pytest
+
+from nagaram.lexicon import (
+    AlphagramIndex,
+    Lexicon,
+    LengthIndex,
+    load_alphagram_index,
+    load_length_index,
+    load_lexicon,
+    wordlist_path,
+)
+
+
+WORDS = [b"aa", b"ab", b"abc", b"b", b"ba", b"bad", b"cab"]
+
+
+@pytest.fixture
+def lexicon():
+    """A small Lexicon to test with."""
+
+    return Lexicon.from_words(WORDS)
+
+
+def test_iteration(lexicon):
+    """Iterating should decode every word, in order."""
+
+    assert list(lexicon) == [word.decode("ascii") for word in WORDS]
+    assert len(lexicon) == len(WORDS)
+
+
+def test_from_generator():
+    """Words can be packed from a generator, which is only read once."""
+
+    lexicon = Lexicon.from_words(word for word in WORDS)
+    assert list(lexicon) == [word.decode("ascii") for word in WORDS]
+
+
+@pytest.mark.parametrize(
+    "data",
+    (b"aa\nab\nabc\n", b"aa\r\nab\r\nabc", b"\naa\n\nab\nabc\n\n"),
+    ids=("unix", "windows", "blank_lines"),
+)
+@pytest.mark.parametrize("block_size", (1, 4, 1 << 16))
+def test_from_file(tmpdir, monkeypatch, data, block_size):
+    """Word list files are split on whitespace, skipping blank lines."""
+
+    monkeypatch.setattr("nagaram.lexicon._READ_BLOCK_SIZE", block_size)
+    wordfile = tmpdir.join("words.txt")
+    wordfile.write_binary(data)
+    lexicon = Lexicon.from_file(str(wordfile))
+
+    assert list(lexicon) == ["aa", "ab", "abc"]
+    assert bytes(lexicon.blob) == b"aaababc"
+
+
+def test_random_access(lexicon):
+    """Indexing should work like a list, including negative indexes."""
+
+    assert lexicon[0] == "aa"
+    assert lexicon[3] == "b"
+    assert lexicon[-1] == "cab"
+
+    with pytest.raises(IndexError):
+        lexicon[len(WORDS)]
+
+
+def test_slicing(lexicon):
+    """Slices are views sharing the same blob."""
+
+    view = lexicon[2:5]
+    assert view.blob is lexicon.blob
+    assert list(view) == ["abc", "b", "ba"]
+    assert view[0] == "abc"
+    assert view[-1] == "ba"
+    assert list(view[1:]) == ["b", "ba"]
+    assert list(lexicon[5:2]) == []
+
+    with pytest.raises(ValueError):
+        lexicon[::2]
+
+
+@pytest.mark.parametrize(
+    "prefix,expected",
+    (
+        ("a", ["aa", "ab", "abc"]),
+        ("ab", ["ab", "abc"]),
+        ("b", ["b", "ba", "bad"]),
+        ("c", ["cab"]),
+        ("d", []),
+        ("", ["aa", "ab", "abc", "b", "ba", "bad", "cab"]),
+        ("é", []),
+    ),
+    ids=("a", "ab", "b", "c", "missing", "empty", "unicode"),
+)
+def test_prefix_range(lexicon, prefix, expected):
+    """Prefix ranges should contain only words starting with prefix."""
+
+    assert list(lexicon.prefix_range(prefix)) == expected
+    assert list(lexicon[1:].prefix_range(prefix)) == [
+        word for word in expected if word != "aa"
+    ]
+
+
+@pytest.mark.parametrize("sowpods", (False, True), ids=("twl", "sowpods"))
+def test_bundled_word_lists(sowpods):
+    """The bundled lists should load once and match the files."""
+
+    lexicon = load_lexicon(sowpods)
+    assert load_lexicon(sowpods) is lexicon
+
+    with open(wordlist_path(sowpods)) as wordfile:
+        words = wordfile.read().split()
+    assert len(lexicon) == len(words)
+    assert lexicon[0] == words[0]
+    assert lexicon[-1] == words[-1]
+    assert lexicon[len(words) // 2] == words[len(words) // 2]
+
+
+def test_length_index(lexicon):
+    """Words should be bucketed by length, alphabetically within a bucket."""
+
+    length_index = LengthIndex.from_lexicon(lexicon)
+    assert length_index.longest == 3
+    assert length_index.lengths() == [1, 2, 3]
+    assert length_index.lengths(2) == [2, 3]
+    assert length_index.lengths(max_length=2) == [1, 2]
+    assert length_index.lengths(3, 2) == []
+    assert list(length_index.bucket(1)) == ["b"]
+    assert list(length_index.bucket(2)) == ["aa", "ab", "ba"]
+    assert list(length_index.bucket(3)) == ["abc", "bad", "cab"]
+    assert list(length_index.bucket(4)) == []
+    assert length_index.bucket_size(2) == 3
+    assert length_index.bucket_size(9) == 0
+
+
+def test_length_index_bucket_range(lexicon):
+    """Only the words of a length within the range should be found."""
+
+    length_index = LengthIndex.from_lexicon(lexicon)
+    view = lexicon.prefix_range("b")
+    assert list(length_index.bucket_range(2, view.start, view.stop)) == [4]
+    assert list(length_index.bucket_range(3, view.start, view.stop)) == [5]
+    assert list(length_index.bucket_range(3, 0, len(WORDS))) == [2, 5, 6]
+    assert list(length_index.bucket_range(9, 0, len(WORDS))) == []
+
+
+def test_length_index_measure(lexicon):
+    """Words can be bucketed by a length other than their bytes."""
+
+    length_index = LengthIndex.from_lexicon(lexicon, lambda word: len(
+        word.replace("ab", "X")))
+    assert list(length_index.bucket(1)) == ["ab", "b"]
+    assert list(length_index.bucket(2)) == ["aa", "abc", "ba", "cab"]
+
+
+def test_unknown_word_list():
+    """Only the bundled word lists can be loaded without installing them."""
+
+    with pytest.raises(ValueError):
+        load_lexicon("klingon")
+
+
+def test_length_index_of_view(lexicon):
+    """A LengthIndex over a slice should only contain the sliced words."""
+
+    length_index = LengthIndex.from_lexicon(lexicon[3:])
+    assert list(length_index.bucket(2)) == ["ba"]
+    assert list(length_index.bucket(3)) == ["bad", "cab"]
+
+
+@pytest.mark.parametrize("sowpods", (False, True), ids=("twl", "sowpods"))
+def test_bundled_length_index(sowpods):
+    """Every bundled word should be in the bucket for its length."""
+
+    length_index = load_length_index(sowpods)
+    assert load_length_index(sowpods) is length_index
+    assert length_index.lexicon is load_lexicon(sowpods)
+    assert length_index.lengths()[0] == 2
+    assert length_index.longest == 15
+    assert sum(
+        length_index.bucket_size(length)
+        for length in length_index.lengths()
+    ) == len(length_index.lexicon)
+    assert all(len(word) == 15 for word in length_index.bucket(15))
+
+
+def test_alphagram_index(lexicon):
+    """Words should be found by their sorted letters."""
+
+    alphagram_index = AlphagramIndex.from_lexicon(lexicon)
+    assert len(alphagram_index) == 5
+    assert alphagram_index.words("ab") == ["ab", "ba"]
+    assert alphagram_index.words("abc") == ["abc", "cab"]
+    assert alphagram_index.words("abd") == ["bad"]
+    assert alphagram_index.words("b") == ["b"]
+    assert alphagram_index.words("ba") == []
+    assert alphagram_index.words("zz") == []
+    assert alphagram_index.words("é") == []
+
+
+def test_bundled_alphagram_index():
+    """The bundled alphagram index should load once."""
+
+    alphagram_index = load_alphagram_index()
+    assert load_alphagram_index() is alphagram_index
+    assert "retains" in alphagram_index.words("aeinrst")
@@ -0,0 +1,94 @@
+"""Tests for multi-word phrase anagrams."""
+
+
+import time
+
+import pytest
+
+from nagaram.phrases import phrase_anagrams
+
+
+def test_dormitory():
+    """The classic: dormitory -> dirty room."""
+
+    phrases = list(phrase_anagrams("dormitory", max_words=2))
+    assert phrases[0] == ("dormitory",)
+    assert ("dirty", "room") in phrases
+    assert ("dirt", "roomy") in phrases
+    assert all(len(phrase) <= 2 for phrase in phrases)
+
+
+def test_spaces_and_case_ignored():
+    """The input can itself be a phrase."""
+
+    assert list(phrase_anagrams("Dirty Room", max_words=2)) == list(
+        phrase_anagrams("dormitory", max_words=2))
+
+
+def test_phrases_use_every_letter_once():
+    """Every phrase is a full anagram, and never a permutation of another."""
+
+    phrases = list(phrase_anagrams("astronomers", sowpods=True))
+    assert len(phrases) == len(set(phrases))
+    for phrase in phrases:
+        assert sorted("".join(phrase)) == sorted("astronomers")
+        assert list(phrase) == sorted(phrase)
+
+
+def test_repeated_words():
+    """A word can appear more than once in a phrase."""
+
+    phrases = list(phrase_anagrams("dodo", max_words=2))
+    assert ("do", "do") in phrases
+    assert ("do", "od") in phrases
+    assert ("od", "do") not in phrases
+    assert ("od", "od") in phrases
+
+
+@pytest.mark.parametrize(
+    "kwargs,check",
+    (
+        ({"max_words": 1}, lambda phrase: len(phrase) == 1),
+        ({"min_length": 4}, lambda phrase: min(map(len, phrase)) >= 4),
+    ),
+    ids=("max_words", "min_length"),
+)
+def test_phrase_limits(kwargs, check):
+    """Word count and word length limits should apply to every phrase."""
+
+    phrases = list(phrase_anagrams("dormitory", **kwargs))
+    assert phrases
+    assert all(check(phrase) for phrase in phrases)
+
+
+@pytest.mark.parametrize("limit", (0, 1, 5), ids=("none", "one", "five"))
+def test_result_limit(limit):
+    """No more than limit phrases should be found."""
+
+    assert len(list(phrase_anagrams("dormitory", limit=limit))) == limit
+
+
+def test_nothing_to_find():
+    """Inputs without letters or without phrases find nothing."""
+
+    assert list(phrase_anagrams("")) == []
+    assert list(phrase_anagrams("123 !")) == []
+    assert list(phrase_anagrams("qqqq")) == []
+
+
+def test_too_many_of_one_letter():
+    """Letter counts are limited by the packed multiset representation."""
+
+    with pytest.raises(ValueError):
+        list(phrase_anagrams("e" * 32))
+
+
+def test_long_inputs_are_responsive():
+    """Searching 15 to 20 letters should only take a moment."""
+
+    list(phrase_anagrams("a"))  # warm up the word list
+    started = time.time()
+    phrases = list(phrase_anagrams("thequickbrownfox", max_words=4))
+    assert ("fox", "quit", "workbench") in phrases
+    list(phrase_anagrams("abcdefghijklmnopqrst"))
+    assert time.time() - started < 10
@@ -0,0 +1,128 @@
+"""Tests for incremental rack queries."""
+
+
+import random
+
+import pytest
+
+from nagaram.anagrams import anagrams_in_word
+from nagaram.session import RackSession
+
+
+def _expected(session):
+    """The results of running the session's query from scratch."""
+
+    return dict(anagrams_in_word(
+        session.tiles,
+        session.sowpods,
+        session.start,
+        session.end,
+        session.min_length,
+        session.max_length,
+    ))
+
+
+def test_starting_rack():
+    """A new session should have the results of the full query."""
+
+    session = RackSession("word")
+    assert session.tiles == "word"
+    assert session.results == dict(anagrams_in_word("word"))
+
+
+def test_empty_rack():
+    """Nothing can be made from nothing."""
+
+    assert RackSession().results == {}
+
+
+def test_add_letter():
+    """Adding a letter should only report the words it changes."""
+
+    session = RackSession("wor")
+    diff = session.add("d")
+    assert sorted(diff["added"]) == [
+        ("do", 3), ("dor", 4), ("dow", 7), ("od", 3), ("rod", 4), ("word", 8),
+    ]
+    assert diff["removed"] == []
+    assert diff["changed"] == []
+    assert session.results == _expected(session)
+
+
+def test_remove_letter():
+    """Removing a letter should report the words no longer possible."""
+
+    session = RackSession("word")
+    diff = session.remove("w")
+    assert sorted(diff["removed"]) == ["dow", "ow", "row", "wo", "word"]
+    assert diff["added"] == []
+    assert session.results == _expected(session)
+
+
+def test_remove_missing_tile():
+    """Only tiles in the rack can be removed."""
+
+    session = RackSession("word")
+    with pytest.raises(ValueError):
+        session.remove("z")
+    assert session.tiles == "word"
+
+
+def test_blank_changes_scores():
+    """Filling a letter with a blank scores no points for it."""
+
+    session = RackSession("wor_")
+    assert session.results["word"] == 6
+    diff = session.swap("_", "d")
+    assert ("word", 8) in diff["changed"]
+    assert session.tiles == "word"
+    assert session.results == _expected(session)
+
+
+def test_questions_change_scores():
+    """Adding a question scores the letters it fills."""
+
+    session = RackSession("wor_")
+    diff = session.add("?")
+    assert ("word", 8) in diff["changed"]
+    assert session.questions == 1
+    assert session.results == _expected(session)
+
+
+@pytest.mark.parametrize(
+    "sowpods,start,end,min_length,max_length",
+    (
+        (False, "", "", None, None),
+        (True, "", "", None, None),
+        (False, "un", "", None, None),
+        (True, "", "s", 3, None),
+        (False, "re", "ed", None, 6),
+    ),
+    ids=("twl", "sowpods", "start", "end_min", "both_max"),
+)
+def test_random_edits(sowpods, start, end, min_length, max_length):
+    """The results should always match a query from scratch."""
+
+    rng = random.Random(start + end)
+    session = RackSession("ab", sowpods, start, end, min_length, max_length)
+    tiles = "abcdefghijklmnopqrstuvwxyz_?aeiost"
+    for _ in range(40):
+        before = dict(session.results)
+        if session.tiles and (len(session.tiles) > 8 or rng.random() < 0.4):
+            diff = session.remove(rng.choice(session.tiles))
+        elif session.tiles and rng.random() < 0.3:
+            diff = session.swap(rng.choice(session.tiles), rng.choice(tiles))
+        else:
+            diff = session.add(rng.choice(tiles))
+
+        assert session.results == _expected(session)
+
+        for word, score in diff["added"]:
+            assert word not in before
+        for word in diff["removed"]:
+            assert word in before
+        before.update(diff["added"])
+        before.update(diff["changed"])
+        for word in diff["removed"]:
+            del before[word]
+        assert before == session.results
@@ -0,0 +1,150 @@
+"""Tests for sharing word list indexes between processes."""
+
+
+import subprocess
+import sys
+
+import pytest
+
+from nagaram import lexicon
+from nagaram.anagrams import anagrams_in_word, compare_engines
+from nagaram.batch import batch_anagrams, solve_rack
+from nagaram.shared import (
+    attach_index_file,
+    attach_shared_index,
+    check_shared_index,
+    create_shared_index,
+    write_index_file,
+)
+from nagaram.simulation import simulate
+
+
+@pytest.fixture
+def restore_indexes():
+    """Puts the indexes built by this process back after a test."""
+
+    caches = (
+        lexicon._LEXICONS,
+        lexicon._LENGTH_INDEXES,
+        lexicon._ALPHAGRAM_INDEXES,
+    )
+    saved = [dict(cache) for cache in caches]
+    yield
+    for cache, contents in zip(caches, saved):
+        cache.clear()
+        cache.update(contents)
+
+
+@pytest.fixture
+def shared_twl():
+    """A shared memory block holding the TWL index."""
+
+    block = create_shared_index()
+    yield block
+    block.close()
+    block.unlink()
+
+
+def _check_indexes(indexes, sowpods):
+    """The attached indexes should match the ones built from the word list."""
+
+    attached_sowpods, attached, length_index, alphagram_index = indexes
+    assert attached_sowpods == sowpods
+    built = lexicon.Lexicon.from_file(lexicon.wordlist_path(sowpods))
+    assert len(attached) == len(built)
+    assert attached[0] == built[0]
+    assert attached[-1] == built[-1]
+    assert list(attached.prefix_range("saxifr")) == list(
+        built.prefix_range("saxifr"))
+    assert list(length_index.bucket(15)) == list(
+        lexicon.LengthIndex.from_lexicon(built).bucket(15))
+    assert "retains" in alphagram_index.words("aeinrst")
+
+
+def test_attach_shared_memory(shared_twl, restore_indexes):
+    """Attaching should give working, installed, read-only indexes."""
+
+    indexes = attach_shared_index(shared_twl.name)
+    _check_indexes(indexes, False)
+    assert lexicon.load_lexicon() is indexes[1]
+    assert compare_engines("retain_") == {}
+    assert ("word", 8) in anagrams_in_word("word")
+
+    with pytest.raises(TypeError):
+        memoryview(indexes[1].blob)[0] = 0
+
+
+@pytest.mark.parametrize("sowpods", (False, True), ids=("twl", "sowpods"))
+def test_attach_index_file(sowpods, tmpdir, restore_indexes):
+    """Index files should be memory mapped the same way."""
+
+    path = str(tmpdir.join("index"))
+    write_index_file(path, sowpods)
+    indexes = attach_index_file(path, install=False)
+    _check_indexes(indexes, sowpods)
+    assert lexicon.load_lexicon(sowpods) is not indexes[1]
+
+
+def test_attach_not_an_index(tmpdir):
+    """Anything else should be refused."""
+
+    path = tmpdir.join("index")
+    path.write("not an index at all, not at all, not even close")
+    with pytest.raises(ValueError):
+        attach_index_file(str(path))
+
+
+def test_attach_other_word_list(shared_twl, tmpdir, restore_indexes):
+    """An index holding the other word list than asked for is refused."""
+
+    with pytest.raises(ValueError):
+        attach_shared_index(shared_twl.name, sowpods=True)
+    with pytest.raises(ValueError):
+        check_shared_index(shared_twl.name, True)
+    check_shared_index(shared_twl.name, False)
+
+    path = str(tmpdir.join("index"))
+    write_index_file(path, True)
+    with pytest.raises(ValueError):
+        attach_index_file(path, install=False, sowpods=False)
+    assert attach_index_file(path, install=False, sowpods=True)[0] is True
+
+
+def test_attach_from_another_process(shared_twl):
+    """A fresh process should attach without building anything."""
+
+    code = (
+        "import sys\n"
+        "from nagaram.shared import attach_shared_index\n"
+        "from nagaram.anagrams import anagrams_in_word\n"
+        "attach_shared_index(sys.argv[1])\n"
+        "print(sorted(anagrams_in_word('word'))[-1])\n"
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", code, shared_twl.name],
+        stderr=subprocess.STDOUT,
+    )
+    assert output.decode().strip() == "('word', 8)"
+
+
+def test_workers_attach(shared_twl):
+    """Batch and simulation workers should use the shared index."""
+
+    racks = ["word", "cat", "retain_"]
+    received = list(batch_anagrams(racks, workers=2, buffer_size=2,
+                                   shared_index=shared_twl.name))
+    assert received == [solve_rack((rack, "", "")) for rack in racks]
+
+    assert simulate(20, seed=5, workers=2, shared_index=shared_twl.name) == (
+        simulate(20, seed=5))
+
+
+def test_workers_attach_other_word_list(shared_twl):
+    """Workers are not started on an index holding the other word list."""
+
+    with pytest.raises(ValueError):
+        list(batch_anagrams(["word"], sowpods=True, workers=2,
+                            shared_index=shared_twl.name))
+    with pytest.raises(ValueError):
+        simulate(5, seed=5, sowpods=True, workers=2,
+                 shared_index=shared_twl.name)
@@ -0,0 +1,119 @@
+"""Tests for the Monte Carlo rack simulation."""
+
+
+import pytest
+
+from nagaram.anagrams import anagrams_in_word
+from nagaram.scrabble import LETTERS_IN_BAG, valid_scrabble_word
+from nagaram.simulation import draw_racks, full_bag, simulate, solve_rack
+
+
+def test_full_bag():
+    """The bag should hold every tile, 100 in all."""
+
+    bag = full_bag()
+    assert len(bag) == sum(LETTERS_IN_BAG.values()) == 100
+    assert bag.count("e") == 12
+    assert bag.count("_") == 2
+
+
+def test_draws_are_reproducible():
+    """The same seed should always draw the same racks."""
+
+    assert list(draw_racks(50, seed=7)) == list(draw_racks(50, seed=7))
+    assert list(draw_racks(50, seed=7)) != list(draw_racks(50, seed=8))
+
+
+@pytest.mark.parametrize("rack_size", (1, 7, 9), ids=("one", "seven", "nine"))
+def test_draws_are_valid_racks(rack_size):
+    """Every rack drawn should be possible from a single bag."""
+
+    for rack in draw_racks(200, seed=1, rack_size=rack_size):
+        assert len(rack) == rack_size
+        assert list(rack) == sorted(rack)
+        assert valid_scrabble_word(rack)
+
+
+@pytest.mark.parametrize(
+    "rack,expected",
+    (
+        ("aeinrst", ("aeinrst", 57, "anestri", True)),
+        ("dorw", ("dorw", 8, "word", True)),
+        ("do", ("do", 3, "do", True)),
+        ("qqq", ("qqq", 0, None, False)),
+        ("__bcdef", ("__bcdef", 11, "biface", False)),
+        ("__", ("__", 0, "aa", True)),
+    ),
+    ids=("bingo", "best_first", "tie_alphabetical", "no_plays",
+         "double_blank", "only_blanks"),
+)
+def test_solve_rack(rack, expected):
+    """The best play is the highest scoring, then alphabetically first."""
+
+    assert solve_rack(rack) == expected
+
+
+def _best_play(rack):
+    """The best play for a rack, from every anagram of it."""
+
+    best_score = 0
+    best_word = None
+    bingo = False
+    for word, score in anagrams_in_word(rack):
+        if (best_word is None or score > best_score or
+                (score == best_score and word < best_word)):
+            best_score = score
+            best_word = word
+        bingo = bingo or len(word) == len(rack)
+    return rack, best_score, best_word, bingo
+
+
+def test_solve_rack_matches_anagrams():
+    """The early stopping search agrees with scoring every anagram."""
+
+    racks = [rack for rack in draw_racks(400, seed=9) if "_" in rack][:10]
+    racks += list(draw_racks(20, seed=4))
+    racks += ["?" + rack[1:] for rack in draw_racks(5, seed=5)]
+
+    for rack in racks:
+        assert solve_rack(rack) == _best_play(rack)
+
+
+def test_simulate():
+    """Statistics should be consistent with the racks drawn."""
+
+    stats = simulate(200, seed=3, batch_size=50, top=5)
+    racks = list(draw_racks(200, seed=3))
+    solutions = [solve_rack(rack) for rack in racks]
+
+    assert stats["samples"] == 200
+    assert stats["unique_racks"] == len(set(racks))
+    assert stats["mean_best_score"] == pytest.approx(
+        sum(solution[1] for solution in solutions) / 200.0)
+    assert stats["bingo_rate"] == pytest.approx(
+        sum(solution[3] for solution in solutions) / 200.0)
+    assert stats["no_play_rate"] == pytest.approx(
+        sum(solution[2] is None for solution in solutions) / 200.0)
+    assert len(stats["top_plays"]) == 5
+    counts = [count for _, count in stats["top_plays"]]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_simulate_independent_of_workers():
+    """Only the seed should change the results."""
+
+    serial = simulate(60, seed=11, batch_size=25)
+    assert simulate(60, seed=11, workers=2, batch_size=7) == serial
+
+
+def test_simulate_nothing():
+    """No samples, no statistics."""
+
+    assert simulate(0) == {
+        "samples": 0,
+        "unique_racks": 0,
+        "mean_best_score": 0.0,
+        "bingo_rate": 0.0,
+        "no_play_rate": 0.0,
+        "top_plays": [],
+    }
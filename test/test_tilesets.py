@@ -0,0 +1,211 @@
+#coding: utf-8
+"""Tests for compiled tile sets."""
+
+
+import pytest
+
+from nagaram.anagrams import tile_anagrams
+from nagaram.engines import REFERENCE_ENGINE, plan
+from nagaram.lexicon import load_length_index
+from nagaram.scrabble import letter_score, word_score, valid_scrabble_word
+from nagaram.tilesets import TILESETS, compile_tileset, install_word_list
+
+
+SPANISH = TILESETS["spanish"]
+
+
+def test_compile_tileset():
+    """Definitions compile into lists indexed by tile number."""
+
+    tileset = compile_tileset("""
+    # a comment
+    a 1 3
+    ch 5 1  # a digraph
+    _ 0 2
+    """, "test")
+
+    assert tileset.name == "test"
+    assert tileset.tiles == ("a", "ch")
+    assert tileset.values == [1, 5]
+    assert tileset.counts == [3, 1]
+    assert tileset.blanks == 2
+
+
+@pytest.mark.parametrize("definition", (
+    "a 1",
+    "a one 1",
+    "a 1 -1",
+    "? 0 2",
+    "a 1 1\na 2 2",
+    "_ 0 1\n_ 0 2\na 1 1",
+    "# no tiles",
+    "_ 0 2",
+))
+def test_invalid_definitions(definition):
+    """Bad, duplicate or missing tiles raise ValueError."""
+
+    with pytest.raises(ValueError):
+        compile_tileset(definition)
+
+
+@pytest.mark.parametrize("word,tiles", (
+    ("chorro", ["ch", "o", "rr", "o"]),
+    ("llorar", ["ll", "o", "r", "a", "r"]),
+    ("año", ["a", "ñ", "o"]),
+    ("casa", ["c", "a", "s", "a"]),
+))
+def test_digraph_encoding(word, tiles):
+    """The longest tile is used first."""
+
+    assert [SPANISH.tiles[n] for n in SPANISH.encode(word)] == tiles
+
+
+def test_encode_invalid():
+    """Characters which are not tiles raise TypeError."""
+
+    with pytest.raises(TypeError):
+        SPANISH.encode("kilo")
+    with pytest.raises(TypeError):
+        TILESETS["english"].encode("año")
+
+
+@pytest.mark.parametrize("name,size", (
+    ("english", 100),
+    ("french", 102),
+    ("spanish", 100),
+    ("dutch", 102),
+))
+def test_bag_sizes(name, size):
+    """Every bag holds the right number of tiles, including blanks."""
+
+    assert sum(TILESETS[name].bag().values()) == size
+
+
+def test_english_values():
+    """The English tile set scores the same as the original score table."""
+
+    original = {
+        1: "aeioulnrst",
+        2: "dg",
+        3: "bcmp",
+        4: "fhvwy",
+        5: "k",
+        8: "jx",
+        10: "qz",
+    }
+    for score, letters in original.items():
+        for letter in letters:
+            assert letter_score(letter) == score
+            assert letter_score(letter.upper()) == score
+
+
+def test_letter_score_tileset():
+    """Digraph tiles are scored as a single tile."""
+
+    assert letter_score("ch", SPANISH) == 5
+    assert letter_score("k", TILESETS["french"]) == 10
+    with pytest.raises(TypeError):
+        letter_score("k", SPANISH)
+
+
+def test_word_score_tileset():
+    """Racks are counted in tiles, blanks fill the missing ones."""
+
+    assert word_score("chorro", ["ch", "o", "rr", "o"], tileset=SPANISH) == 15
+    assert word_score("chorro", ["c", "h", "o", "r", "r", "o"],
+                      tileset=SPANISH) == 2
+    assert word_score("chorro", ["o", "o"], 2, SPANISH) == 15
+
+
+@pytest.mark.parametrize("word,valid", (
+    ("chorro", True),
+    ("chch", True),
+    ("chch_", True),
+    ("chchchch", False),
+    ("chch__", False),
+    ("ñññ", True),
+    ("ññññ", False),
+    ("kilo", False),
+))
+def test_valid_word(word, valid):
+    """Words are checked against the tile counts of the bag."""
+
+    assert valid_scrabble_word(word, SPANISH) is valid
+
+
+@pytest.fixture(scope="module")
+def spanish_words():
+    """A small Spanish word list, installed for searching."""
+
+    install_word_list("test-spanish", [
+        "chorro", "coro", "ocho", "horro", "rorro", "kilo", "o", "año",
+        "llorar", "oro",
+    ], SPANISH)
+    return "test-spanish"
+
+
+def test_install_word_list(spanish_words):
+    """Words which are not tiles are skipped, lengths are counted in tiles."""
+
+    length_index = load_length_index(spanish_words)
+    assert "kilo" not in list(length_index.lexicon)
+    assert list(length_index.bucket(3)) == ["año", "ocho", "oro"]
+    assert list(length_index.bucket(4)) == ["chorro", "coro", "horro",
+                                            "rorro"]
+
+
+def test_unknown_word_list():
+    """Word lists have to be installed before searching them."""
+
+    with pytest.raises(ValueError):
+        list(tile_anagrams("oro", "test-missing", SPANISH))
+
+
+def test_tile_anagrams(spanish_words):
+    """Words are matched in tiles, shortest first."""
+
+    found = list(tile_anagrams("chorro", spanish_words, SPANISH))
+
+    assert found == [("o", 1), ("ocho", 7), ("chorro", 15)]
+
+
+def test_tile_anagrams_blanks(spanish_words):
+    """Blanks and start or end letters fill in missing tiles."""
+
+    assert list(tile_anagrams("orro_", spanish_words, SPANISH)) == [
+        ("o", 1), ("ocho", 2), ("oro", 2), ("chorro", 10), ("horro", 10),
+        ("rorro", 10)]
+    assert [word for word, _ in tile_anagrams(
+        "orro", spanish_words, SPANISH, start="ch")] == ["chorro"]
+
+
+def test_tile_anagrams_lengths(spanish_words):
+    """Length limits are counted in tiles."""
+
+    def _words(**lengths):
+        return [word for word, _ in tile_anagrams(
+            "orro_", spanish_words, SPANISH, **lengths)]
+
+    assert _words(min_length=4) == ["chorro", "horro", "rorro"]
+    assert _words(max_length=3) == ["o", "ocho", "oro"]
+
+
+@pytest.mark.parametrize("start,end", (("", ""), ("ch", ""), ("", "o")))
+def test_tile_engines_agree(spanish_words, start, end):
+    """The engines which can search other languages find the same words."""
+
+    expected = list(tile_anagrams("orro_", spanish_words, SPANISH, start,
+                                  end, engine=REFERENCE_ENGINE))
+    assert list(tile_anagrams("orro_", spanish_words, SPANISH, start, end,
+                              engine="prefix")) == expected
+
+
+def test_alphagram_engine_english_only(spanish_words):
+    """Wildcards are filled from a to z, so other languages use a scan."""
+
+    letters = ["orro", "ch", ""]
+    assert plan(spanish_words, letters, 1, "ch", "", [4], SPANISH) != (
+        "alphagram")
+    with pytest.raises(ValueError):
+        list(tile_anagrams("orro", spanish_words, SPANISH,
+                           engine="alphagram"))